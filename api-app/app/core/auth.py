@@ -68,16 +68,22 @@ from app.models import User
 #         raise HTTPException(status_code=400, detail="Inactive user")
 #     return current_user
 
+# Placeholder user, built once and shared by every request
+_placeholder_user: Optional[User] = None
+
 async def get_current_active_user() -> User:
     """Get the current active user"""
+    global _placeholder_user
     
     # This is a placeholder for the actual user retrieval logic.
-    current_user = User(
-        id=str(uuid.uuid4()),
-        partition_key="user",
-        email="user@email.com",
-        is_active=True
-    )
+    if _placeholder_user is None:
+        _placeholder_user = User(
+            id=str(uuid.uuid4()),
+            partition_key="user",
+            email="user@email.com",
+            is_active=True
+        )
+    current_user = _placeholder_user
 
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
@@ -3,11 +3,15 @@ from dotenv import load_dotenv, find_dotenv
 from functools import lru_cache
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+# Load the .env file before the settings singleton is created
+load_dotenv(find_dotenv('.env'))
+
 
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(env_file='.env', 
                                       env_file_encoding='utf-8',
-                                      extra='allow')
+                                      extra='allow',
+                                      frozen=True)
 
     # API Settings
     PROJECT_NAME: str = "AI Investment Analysis Sample API"
@@ -38,10 +42,12 @@ class Settings(BaseSettings):
     AZURE_OPENAI_ENDPOINT: str = ""
     AZURE_OPENAI_DEPLOYMENT_NAME: str = ""
 
+    # Workflow Settings
+    ANALYSIS_WORKFLOW_WORKERS: int = 4
+    CHAT_WORKFLOW_WORKERS: int = 16
+
 @lru_cache()
 def get_settings() -> Settings:
     return Settings()
 
-load_dotenv(find_dotenv('.env'))
-
 settings: Settings = get_settings()
\ No newline at end of file
@@ -0,0 +1,103 @@
+"""
+Request-scoped read cache for Cosmos DB point reads
+Keeps the documents read while handling one request so a read-modify-write within that request skips a round-trip.
+Nothing is shared between requests, so a read never returns a copy another request or replica may have changed since.
+"""
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Any, Dict, Hashable, Optional, Set, Tuple
+
+
+class ItemCache:
+    """Bounded LRU cache keyed by (container, item id, partition key)"""
+
+    def __init__(self, maxsize: int = 256):
+        self._maxsize = maxsize
+        self._items: "OrderedDict[Hashable, Dict[str, Any]]" = OrderedDict()
+        # Keys cached for each (container, item id), so an item is invalidated without scanning the cache
+        self._keys_by_item: Dict[Tuple[str, str], Set[Hashable]] = {}
+
+    def get(self, key: Hashable) -> Optional[Dict[str, Any]]:
+        """Get a copy of a cached document, or None if missing"""
+        item = self._items.get(key)
+        if item is None:
+            return None
+
+        self._items.move_to_end(key)
+        # Callers merge updates into the returned dict, so never hand out the cached instance
+        return dict(item)
+
+    def set(self, key: Hashable, item: Dict[str, Any]) -> None:
+        """Cache a copy of a document, evicting the least recently used entry when full"""
+        self._items[key] = dict(item)
+        self._items.move_to_end(key)
+        self._keys_by_item.setdefault(key[:2], set()).add(key)
+        if len(self._items) > self._maxsize:
+            self._discard(self._items.popitem(last=False)[0])
+
+    def pop(self, key: Hashable) -> None:
+        """Remove a document from the cache"""
+        if self._items.pop(key, None) is not None:
+            self._discard(key)
+
+    def pop_item(self, container_name: str, item_id: str) -> None:
+        """Remove a document from the cache regardless of its partition key"""
+        for key in self._keys_by_item.pop((container_name, item_id), ()):
+            self._items.pop(key, None)
+
+    def _discard(self, key: Hashable) -> None:
+        """Drop a key from the per-item index"""
+        keys = self._keys_by_item.get(key[:2])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_item[key[:2]]
+
+
+# Cache of the request being handled, unset outside of requests such as in background workflows
+_request_item_cache: ContextVar[Optional[ItemCache]] = ContextVar("request_item_cache", default=None)
+
+
+class RequestItemCache:
+    """Routes cache calls to the current request's ItemCache, does nothing outside of a request"""
+
+    def get(self, key: Hashable) -> Optional[Dict[str, Any]]:
+        cache = _request_item_cache.get()
+        return cache.get(key) if cache is not None else None
+
+    def set(self, key: Hashable, item: Dict[str, Any]) -> None:
+        cache = _request_item_cache.get()
+        if cache is not None:
+            cache.set(key, item)
+
+    def pop(self, key: Hashable) -> None:
+        cache = _request_item_cache.get()
+        if cache is not None:
+            cache.pop(key)
+
+    def pop_item(self, container_name: str, item_id: str) -> None:
+        cache = _request_item_cache.get()
+        if cache is not None:
+            cache.pop_item(container_name, item_id)
+
+
+class RequestItemCacheMiddleware:
+    """ASGI middleware giving every HTTP request its own ItemCache"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = _request_item_cache.set(ItemCache())
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _request_item_cache.reset(token)
+
+
+# Item cache used by all repositories, scoped to the current request
+item_cache = RequestItemCache()
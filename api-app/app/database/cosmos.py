@@ -1,7 +1,9 @@
+from azure.core.pipeline.transport import AioHttpTransport
 from azure.cosmos import exceptions, ContainerProxy, DatabaseProxy, PartitionKey
 from azure.cosmos.aio import CosmosClient
 from azure.identity.aio import ChainedTokenCredential
 
+import aiohttp
 import logging
 from typing import Dict
 
@@ -9,6 +11,10 @@ from typing import Dict
 
 logger = logging.getLogger("app.database.cosmos")
 
+# Connection pool settings for the shared Cosmos DB HTTP session
+MAX_CONNECTIONS = 100
+KEEPALIVE_TIMEOUT_SECONDS = 120
+
 class CosmosDBClient:
     """Azure Cosmos DB client wrapper"""
 
@@ -17,6 +23,7 @@ class CosmosDBClient:
         self.endpoint = endpoint
         self.credential = credential
         self.client: CosmosClient = None
+        self.session: aiohttp.ClientSession = None
         self.database_proxy: DatabaseProxy = None
         self.containers: Dict[str, ContainerProxy] = {}
         
@@ -26,9 +33,18 @@ class CosmosDBClient:
         logger.info("Connecting to Cosmos DB...")
         
         try:
+            # Keep one pooled session for the client's lifetime so requests reuse TCP/TLS connections,
+            # aiohttp requests and decodes gzip responses by default
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=MAX_CONNECTIONS,
+                    keepalive_timeout=KEEPALIVE_TIMEOUT_SECONDS
+                )
+            )
             self.client = CosmosClient(
                 url=self.endpoint,
-                credential=self.credential
+                credential=self.credential,
+                transport=AioHttpTransport(session=self.session, session_owner=False)
             )
             
             logger.info("Attempting to create or get database...")
@@ -64,6 +80,10 @@ class CosmosDBClient:
             self.database_proxy = None
             self.containers = {}
             logger.info("Cosmos DB connection closed")
+        
+        if self.session:
+            await self.session.close()
+            self.session = None
 
     def _initialize_containers(self):
         """Initialize all required containers"""
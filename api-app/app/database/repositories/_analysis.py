@@ -1,8 +1,18 @@
 from typing import List, Optional, Dict, Any
+import json
+from azure.cosmos.exceptions import CosmosAccessConditionFailedError
+from pydantic import TypeAdapter
 from app.database.cosmos import CosmosDBClient
 from . import BaseRepository
 from app.models import Analysis
 
+_ANALYSIS_LIST_ADAPTER = TypeAdapter(List[Analysis])
+
+_Q_ALL = "SELECT * FROM c WHERE c.is_active = @is_active ORDER BY c.created_at DESC"
+_Q_ALL_BY_OWNER = "SELECT * FROM c WHERE c.is_active = @is_active AND c.owner_id = @owner_id ORDER BY c.created_at DESC"
+_Q_BY_OPPORTUNITY = "SELECT * FROM c WHERE c.opportunity_id = @opportunity_id AND c.is_active = true ORDER BY c.created_at DESC"
+
+
 class AnalysisRepository(BaseRepository):
     """Repository for Analysis operations"""
 
@@ -15,26 +25,25 @@ class AnalysisRepository(BaseRepository):
         owner_id: Optional[str] = None
     ) -> List[Analysis]:
         """Get all analyses with optional filtering"""
-        query = "SELECT * FROM c WHERE c.is_active = @is_active"
         parameters = [{"name": "@is_active", "value": is_active}]
         
         if owner_id:
-            query += " AND c.owner_id = @owner_id"
+            query = _Q_ALL_BY_OWNER
             parameters.append({"name": "@owner_id", "value": owner_id})
-        
-        query += " ORDER BY c.created_at DESC"
+        else:
+            query = _Q_ALL
         
         analyses_data = await self.query(query, parameters)
-        return [Analysis(**analysis) for analysis in analyses_data]
+        return _ANALYSIS_LIST_ADAPTER.validate_python(analyses_data)
 
-    async def get_by_opportunity(self, opportunity_id: str) -> List[Analysis]:
-        """Get all analyses for a specific opportunity_id"""
+    async def get_by_opportunity(self, opportunity_id: str, page: int = 1, limit: Optional[int] = None) -> List[Analysis]:
+        """Get all analyses for a specific opportunity_id with optional pagination"""
         
-        query = "SELECT * FROM c WHERE c.opportunity_id = @opportunity_id AND c.is_active = true ORDER BY c.created_at DESC"
         parameters = [{"name": "@opportunity_id", "value": opportunity_id}]
+        query = self.paginate(_Q_BY_OPPORTUNITY, parameters, page, limit)
         
-        _data = await self.query(query, parameters)
-        return [Analysis(**doc) for doc in _data]
+        _data = await self.query(query, parameters, max_item_count=limit, partition_key=opportunity_id)
+        return _ANALYSIS_LIST_ADAPTER.validate_python(_data)
 
     async def get_analysis_by_id(self, analysis_id: str, opportunity_id: str, owner_id: Optional[str] = None) -> Optional[Analysis]:
         """Get a single analysis by ID"""
@@ -43,7 +52,7 @@ class AnalysisRepository(BaseRepository):
         if not item:
             return None
         
-        analysis = Analysis(**item)
+        analysis = Analysis.model_validate(item)
         
         # Verify ownership if owner_id is provided
         if owner_id and analysis.owner_id != owner_id:
@@ -55,7 +64,7 @@ class AnalysisRepository(BaseRepository):
         """Create a new analysis"""
         _dict = item.model_dump(by_alias=True)
         _created = await self.create(_dict)
-        return Analysis(**_created)
+        return Analysis.model_validate(_created)
     
     async def update_analysis(
         self,
@@ -65,14 +74,20 @@ class AnalysisRepository(BaseRepository):
         owner_id: Optional[str] = None
     ) -> Optional[Analysis]:
         """Update an existing analysis"""
-        # Verify analysis exists and user has access
-        existing = await self.get_analysis_by_id(analysis_id, opportunity_id, owner_id)
-        if not existing:
+        # Patch only the updated fields in one request, the filter replaces reading the analysis to check its owner
+        operations = [{"op": "set", "path": f"/{field}", "value": value} for field, value in updates.items()]
+        filter_predicate = f"FROM c WHERE c.owner_id = {json.dumps(owner_id)}" if owner_id else None
+        
+        try:
+            updated_item = await self.patch(analysis_id, operations, opportunity_id, filter_predicate=filter_predicate)
+        except ValueError:
+            # Analysis does not exist
+            return None
+        except CosmosAccessConditionFailedError:
+            # Analysis belongs to another owner
             return None
         
-        # Update the analysis
-        updated_item = await self.update(analysis_id, updates, opportunity_id)
-        return Analysis(**updated_item)
+        return Analysis.model_validate(updated_item)
     
     async def delete_analysis(
         self,
@@ -1,8 +1,23 @@
-from typing import List, Optional, Dict, Any
+from typing import AsyncIterator, List, Optional, Dict, Any
+from pydantic import TypeAdapter
+import asyncio
+
 from app.database.cosmos import CosmosDBClient
 from . import BaseRepository
 from app.models import AnalysisWorkflowEvent
 
+_EVENT_LIST_ADAPTER = TypeAdapter(List[AnalysisWorkflowEvent])
+
+_Q_BY_ANALYSIS = (
+    "SELECT * FROM c WHERE c.analysis_id = @analysis_id AND c.opportunity_id = @opportunity_id AND c.is_deleted = false "
+    "ORDER BY c.sequence ASC"
+)
+_Q_BY_ANALYSIS_AND_OWNER = (
+    "SELECT * FROM c WHERE c.analysis_id = @analysis_id AND c.opportunity_id = @opportunity_id AND c.is_deleted = false "
+    "AND c.owner_id = @owner_id ORDER BY c.sequence ASC"
+)
+
+
 class AnalysisWorkflowEventRepository(BaseRepository):
     """Repository for AnalysisWorkflowEvent operations"""
 
@@ -16,34 +31,59 @@ class AnalysisWorkflowEventRepository(BaseRepository):
         owner_id: Optional[str] = None
     ) -> List[AnalysisWorkflowEvent]:
         """Get all events for a specific analysis"""
-        query = "SELECT * FROM c WHERE c.analysis_id = @analysis_id AND c.opportunity_id = @opportunity_id AND c.is_deleted = false"
         parameters = [
             {"name": "@analysis_id", "value": analysis_id},
             {"name": "@opportunity_id", "value": opportunity_id}
         ]
         
         if owner_id:
-            query += " AND c.owner_id = @owner_id"
+            query = _Q_BY_ANALYSIS_AND_OWNER
             parameters.append({"name": "@owner_id", "value": owner_id})
+        else:
+            query = _Q_BY_ANALYSIS
+        
+        events_data = await self.query(query, parameters, partition_key=analysis_id)
+        return _EVENT_LIST_ADAPTER.validate_python(events_data)
+    
+    async def iter_events_by_analysis(
+        self,
+        analysis_id: str,
+        opportunity_id: str,
+        owner_id: Optional[str] = None
+    ) -> AsyncIterator[AnalysisWorkflowEvent]:
+        """Stream the events for a specific analysis as they are read"""
+        parameters = [
+            {"name": "@analysis_id", "value": analysis_id},
+            {"name": "@opportunity_id", "value": opportunity_id}
+        ]
         
-        query += " ORDER BY c.sequence ASC"
+        if owner_id:
+            query = _Q_BY_ANALYSIS_AND_OWNER
+            parameters.append({"name": "@owner_id", "value": owner_id})
+        else:
+            query = _Q_BY_ANALYSIS
         
-        events_data = await self.query(query, parameters)
-        return [AnalysisWorkflowEvent(**event) for event in events_data]
+        async for item in self.iter_query(query, parameters, partition_key=analysis_id):
+            yield AnalysisWorkflowEvent.model_validate(item)
 
     async def create_event(self, event: AnalysisWorkflowEvent) -> AnalysisWorkflowEvent:
         """Create a new workflow event"""
         _dict = event.model_dump(by_alias=True)
         _created = await self.create(_dict)
-        return AnalysisWorkflowEvent(**_created)
+        return AnalysisWorkflowEvent.model_validate(_created)
     
     async def create_events_batch(self, events: List[AnalysisWorkflowEvent]) -> List[AnalysisWorkflowEvent]:
-        """Create multiple workflow events in batch"""
-        created_events = []
-        for event in events:
-            created_event = await self.create_event(event)
-            created_events.append(created_event)
-        return created_events
+        """Create multiple workflow events in batch, one transactional batch per analysis partition"""
+        events_by_analysis: Dict[str, List[Dict[str, Any]]] = {}
+        # Serialize the whole list in one pass through the compiled serializer
+        for item in _EVENT_LIST_ADAPTER.dump_python(events, by_alias=True):
+            events_by_analysis.setdefault(item["analysis_id"], []).append(item)
+        
+        results = await asyncio.gather(*(
+            self.create_batch(items, partition_key=analysis_id)
+            for analysis_id, items in events_by_analysis.items()
+        ))
+        return _EVENT_LIST_ADAPTER.validate_python([_created for created in results for _created in created])
     
     async def delete_events_by_analysis(
         self,
@@ -58,14 +98,11 @@ class AnalysisWorkflowEventRepository(BaseRepository):
                                                    opportunity_id=opportunity_id, 
                                                    owner_id=owner_id)
         
-        deleted_count = 0
-        for event in events:
-            if soft_delete:
-                # Soft delete: mark as deleted
-                await self.update(item_id=event.id, updates={"is_deleted": True}, partition_key=analysis_id)
-            else:
-                # Hard delete: remove from database
-                await self.delete(item_id=event.id, partition_key=analysis_id)
-            deleted_count += 1
+        event_ids = [event.id for event in events]
+        
+        if soft_delete:
+            # Soft delete: mark as deleted
+            return await self.update_many(item_ids=event_ids, updates={"is_deleted": True}, partition_key=analysis_id)
         
-        return deleted_count
+        # Hard delete: remove from database, all events share the analysis partition
+        return await self.delete_batch(item_ids=event_ids, partition_key=analysis_id)
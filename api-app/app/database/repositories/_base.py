@@ -1,10 +1,42 @@
-from typing import List, Optional, Dict, Any
+from typing import AsyncIterator, Iterator, List, Optional, Dict, Any
 from datetime import datetime, timezone
+import asyncio
+import json
 import uuid
 
+from azure.core import MatchConditions
 from azure.cosmos.container import ContainerProxy
-from azure.cosmos.exceptions import CosmosResourceNotFoundError
+from azure.cosmos.exceptions import CosmosAccessConditionFailedError, CosmosBatchOperationError, CosmosResourceNotFoundError
 from app.database.cosmos import CosmosDBClient
+from app.database.cache import item_cache
+
+# Cosmos DB limits a transactional batch to 100 operations
+MAX_BATCH_OPERATIONS = 100
+
+# Cosmos DB limits a transactional batch request to 2 MB, leave headroom for the batch envelope
+MAX_BATCH_PAYLOAD_BYTES = 1_800_000
+
+# Cosmos DB limits a single patch request to 10 operations
+MAX_PATCH_OPERATIONS = 10
+
+# Number of point operations to keep in flight at once when fanning out requests
+MAX_CONCURRENT_OPERATIONS = 25
+
+def _batch_chunks(items: List[Dict[str, Any]]) -> Iterator[List[Dict[str, Any]]]:
+    """Split items into chunks that fit both the operation count and the payload size of a transactional batch"""
+    chunk: List[Dict[str, Any]] = []
+    chunk_bytes = 0
+    for item in items:
+        # ASCII-escaped JSON is never shorter than the UTF-8 body, so the estimate errs on the safe side
+        item_bytes = len(json.dumps(item, default=str))
+        if chunk and (len(chunk) >= MAX_BATCH_OPERATIONS or chunk_bytes + item_bytes > MAX_BATCH_PAYLOAD_BYTES):
+            yield chunk
+            chunk = []
+            chunk_bytes = 0
+        chunk.append(item)
+        chunk_bytes += item_bytes
+    if chunk:
+        yield chunk
 
 class BaseRepository:
     """Base repository class for common Cosmos DB operations"""
@@ -25,20 +57,60 @@ class BaseRepository:
         response = await self.container.create_item(body=item)
         return response
     
-    async def get_by_id(self, item_id: str, partition_key: str = None) -> Optional[Dict[str, Any]]:
-        """Get document by ID and partition key"""
+    async def create_batch(self, items: List[Dict[str, Any]], partition_key: str) -> List[Dict[str, Any]]:
+        """Create multiple documents sharing the same partition key using transactional batches, split by count and payload size"""
+        now = datetime.now(timezone.utc).isoformat()
+        for item in items:
+            item["created_at"] = now
+            item["updated_at"] = now
+            if "id" not in item:
+                item["id"] = str(uuid.uuid4())
+        
+        created_items = []
+        for chunk in _batch_chunks(items):
+            if len(chunk) == 1:
+                # A single item, possibly too large to share a batch, is created on its own
+                created_items.append(await self.container.create_item(body=chunk[0]))
+                continue
+            
+            batch_operations = [("create", (item,)) for item in chunk]
+            results = await self.container.execute_item_batch(
+                batch_operations=batch_operations,
+                partition_key=partition_key
+            )
+            created_items.extend(result["resourceBody"] for result in results)
+        
+        return created_items
+    
+    def _cache_key(self, item_id: str, partition_key: str = None) -> tuple:
+        """Build the item cache key for a document"""
+        return (self.container_name, item_id, partition_key or item_id)
+    
+    async def get_by_id(self, item_id: str, partition_key: str) -> Optional[Dict[str, Any]]:
+        """Get document by ID and partition key with a single point read"""
+        if not partition_key:
+            raise ValueError(f"A partition key is required to read item {item_id} from {self.container_name}")
+        
+        cache_key = self._cache_key(item_id, partition_key)
+        cached_item = item_cache.get(cache_key)
+        if cached_item is not None:
+            return cached_item
+        
         try:
             response = await self.container.read_item(
                 item=item_id,
-                partition_key=partition_key or item_id
+                partition_key=partition_key
             )
-            return response
         except CosmosResourceNotFoundError:
             return None
+        
+        item_cache.set(cache_key, response)
+        return response
 
     async def update(self, item_id: str, updates: Dict[str, Any], partition_key: str = None) -> Dict[str, Any]:
         """Update a document"""
         updates["updated_at"] = datetime.now(timezone.utc).isoformat()
+        cache_key = self._cache_key(item_id, partition_key)
         
         # Get existing item
         existing_item = await self.get_by_id(item_id, partition_key)
@@ -48,10 +120,28 @@ class BaseRepository:
         # Merge updates
         existing_item.update(updates)
         
-        response = await self.container.replace_item(
-            item=item_id,
-            body=existing_item
-        )
+        try:
+            # Only replace the version that was read, it may have come from the item cache
+            response = await self.container.replace_item(
+                item=item_id,
+                body=existing_item,
+                etag=existing_item.get("_etag"),
+                match_condition=MatchConditions.IfNotModified
+            )
+        except CosmosAccessConditionFailedError:
+            # Cached copy was stale, merge the updates into a fresh read instead
+            item_cache.pop(cache_key)
+            existing_item = await self.get_by_id(item_id, partition_key)
+            if not existing_item:
+                raise ValueError(f"Item with id {item_id}, partition key {partition_key} not found")
+            
+            existing_item.update(updates)
+            response = await self.container.replace_item(
+                item=item_id,
+                body=existing_item
+            )
+        
+        item_cache.set(cache_key, response)
         return response
     
     async def upsert(self, item: Dict[str, Any]) -> Dict[str, Any]:
@@ -61,10 +151,57 @@ class BaseRepository:
         response = await self.container.upsert_item(
             body=item
         )
+        item_cache.pop_item(self.container_name, response["id"])
         return response
-    
+
+    async def patch(
+        self,
+        item_id: str,
+        operations: List[Dict[str, Any]],
+        partition_key: str,
+        filter_predicate: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Apply partial update operations to a document without rewriting it, optionally only when it matches a filter predicate"""
+        options = {"filter_predicate": filter_predicate} if filter_predicate else {}
+        
+        # Each patch request is limited to 10 operations, one of which refreshes updated_at
+        chunk_size = MAX_PATCH_OPERATIONS - 1
+        chunks = [
+            operations[start:start + chunk_size] + [
+                {"op": "set", "path": "/updated_at", "value": datetime.now(timezone.utc).isoformat()}
+            ]
+            for start in range(0, max(len(operations), 1), chunk_size)
+        ]
+
+        try:
+            if len(chunks) == 1:
+                response = await self.container.patch_item(
+                    item=item_id,
+                    partition_key=partition_key,
+                    patch_operations=chunks[0],
+                    **options
+                )
+            else:
+                # Apply larger patches as transactional batches so they land all at once
+                for start in range(0, len(chunks), MAX_BATCH_OPERATIONS):
+                    batch_operations = [("patch", (item_id, chunk), options) for chunk in chunks[start:start + MAX_BATCH_OPERATIONS]]
+                    results = await self.container.execute_item_batch(
+                        batch_operations=batch_operations,
+                        partition_key=partition_key
+                    )
+                response = results[-1]["resourceBody"]
+        except (CosmosResourceNotFoundError, CosmosAccessConditionFailedError, CosmosBatchOperationError) as e:
+            item_cache.pop(self._cache_key(item_id, partition_key))
+            if e.status_code == 404:
+                raise ValueError(f"Item with id {item_id}, partition key {partition_key} not found")
+            raise
+
+        item_cache.set(self._cache_key(item_id, partition_key), response)
+        return response
+
     async def delete(self, item_id: str, partition_key: str) -> bool:
         """Delete a document"""
+        item_cache.pop(self._cache_key(item_id, partition_key))
         try:
             await self.container.delete_item(
                 item=item_id,
@@ -74,13 +211,90 @@ class BaseRepository:
         except CosmosResourceNotFoundError:
             return False
     
-    async def query(self, query: str, parameters: List[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
-        """Execute a SQL query"""
-        items = []
+    async def delete_batch(self, item_ids: List[str], partition_key: str) -> int:
+        """Hard delete multiple documents sharing the same partition key using transactional batches, returns the number of documents deleted"""
+        deleted_count = 0
+        for start in range(0, len(item_ids), MAX_BATCH_OPERATIONS):
+            chunk_ids = item_ids[start:start + MAX_BATCH_OPERATIONS]
+            batch_operations = [("delete", (item_id,)) for item_id in chunk_ids]
+            for item_id in chunk_ids:
+                item_cache.pop(self._cache_key(item_id, partition_key))
+            try:
+                await self.container.execute_item_batch(
+                    batch_operations=batch_operations,
+                    partition_key=partition_key
+                )
+                deleted_count += len(batch_operations)
+            except CosmosBatchOperationError:
+                # The batch is all-or-nothing, one missing document fails it, so delete the chunk item by item
+                deleted_count += await self.delete_many(chunk_ids, partition_key)
+        
+        return deleted_count
+    
+    async def delete_many(self, item_ids: List[str], partition_key: str) -> int:
+        """Delete multiple documents concurrently, returns the number of documents deleted"""
+        deleted_count = 0
+        for start in range(0, len(item_ids), MAX_CONCURRENT_OPERATIONS):
+            results = await asyncio.gather(
+                *(self.delete(item_id, partition_key) for item_id in item_ids[start:start + MAX_CONCURRENT_OPERATIONS]),
+                return_exceptions=True
+            )
+            deleted_count += sum(1 for result in results if result is True)
+        
+        return deleted_count
+    
+    async def update_many(self, item_ids: List[str], updates: Dict[str, Any], partition_key: str) -> int:
+        """Apply the same updates to multiple documents concurrently with patches, returns the number of documents updated"""
+        operations = [{"op": "set", "path": f"/{field}", "value": value} for field, value in updates.items()]
+        updated_count = 0
+        for start in range(0, len(item_ids), MAX_CONCURRENT_OPERATIONS):
+            results = await asyncio.gather(
+                *(self.patch(item_id, operations, partition_key) for item_id in item_ids[start:start + MAX_CONCURRENT_OPERATIONS]),
+                return_exceptions=True
+            )
+            updated_count += sum(1 for result in results if not isinstance(result, BaseException))
+        
+        return updated_count
+    
+    async def iter_query(
+        self,
+        query: str,
+        parameters: List[Dict[str, Any]] = None,
+        max_item_count: Optional[int] = None,
+        partition_key: Optional[str] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream the results of a SQL query one page at a time, scoped to a single partition when a partition key is given"""
+        options = {}
+        if max_item_count:
+            options["max_item_count"] = max_item_count
+        if partition_key:
+            options["partition_key"] = partition_key
+        
         async for item in self.container.query_items(
             query=query,
-            parameters=parameters or []
+            parameters=parameters or [],
+            **options
         ):
-            items.append(item)
+            yield item
+    
+    async def query(
+        self,
+        query: str,
+        parameters: List[Dict[str, Any]] = None,
+        max_item_count: Optional[int] = None,
+        partition_key: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Execute a SQL query, scoped to a single partition when a partition key is given"""
+        return [
+            item async for item in self.iter_query(query, parameters, max_item_count, partition_key)
+        ]
+    
+    @staticmethod
+    def paginate(query: str, parameters: List[Dict[str, Any]], page: int = 1, limit: Optional[int] = None) -> str:
+        """Append an OFFSET/LIMIT clause to a query when a page size is given"""
+        if not limit:
+            return query
         
-        return items
+        parameters.append({"name": "@offset", "value": (max(page, 1) - 1) * limit})
+        parameters.append({"name": "@limit", "value": limit})
+        return query + " OFFSET @offset LIMIT @limit"
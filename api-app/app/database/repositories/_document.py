@@ -1,8 +1,22 @@
-from typing import List, Optional, Dict, Any
+from typing import AsyncIterator, List, Optional, Dict, Any
+from pydantic import TypeAdapter
 from app.database.cosmos import CosmosDBClient
 from app.models import Document
 from . import BaseRepository
 
+_DOCUMENT_LIST_ADAPTER = TypeAdapter(List[Document])
+
+_Q_BY_FILE_NAME = "SELECT TOP 1 * FROM c WHERE c.name = @filename"
+_Q_BY_FILE_NAME_AND_OPPORTUNITY = "SELECT TOP 1 * FROM c WHERE c.name = @filename AND c.opportunity_id = @opportunity_id"
+_Q_BY_IDS = "SELECT * FROM c WHERE ARRAY_CONTAINS(@document_ids, c.id) AND c.opportunity_id = @opportunity_id"
+_Q_BY_OPPORTUNITY = (
+    "SELECT c.id, c.name, c.tags, c.opportunity_id, c.opportunity_name, c.file_url, c.file_type, c.mime_type, c.size, "
+    "c.uploaded_at, c.uploaded_by, c.processing_status, c.processing_progress, c.processing_started_at, "
+    "c.processing_completed_at, c.processing_error, c.created_at, c.updated_at "
+    "FROM c WHERE c.opportunity_id = @opportunity_id ORDER BY c.created_at DESC"
+)
+
+
 class DocumentRepository(BaseRepository):
     """Repository for Document operations"""
 
@@ -17,33 +31,52 @@ class DocumentRepository(BaseRepository):
         if not item:
             return None
         
-        document = Document(**item)
+        document = Document.model_validate(item)
         return document
     
+    async def get_documents_by_ids(self, document_ids: List[str], opportunity_id: str) -> Dict[str, Document]:
+        """Get the documents of an opportunity with one query, keyed by ID, IDs that are not found are left out"""
+        
+        parameters = [
+            {"name": "@document_ids", "value": list(document_ids)},
+            {"name": "@opportunity_id", "value": opportunity_id}
+        ]
+        
+        documents_data = await self.query(_Q_BY_IDS, parameters, partition_key=opportunity_id)
+        return {document.id: document for document in _DOCUMENT_LIST_ADAPTER.validate_python(documents_data)}
+    
     async def get_by_file_name(self, filename:str, opportunity_id:str) -> Optional[Document]:
         """Get a document by its file path and opportunity ID"""
         
-        query = "SELECT * FROM c WHERE c.name = @filename"
         parameters = [{"name": "@filename", "value": filename}]
         
         if opportunity_id:
-            query += " AND c.opportunity_id = @opportunity_id"
+            query = _Q_BY_FILE_NAME_AND_OPPORTUNITY
             parameters.append({"name": "@opportunity_id", "value": opportunity_id})
+        else:
+            query = _Q_BY_FILE_NAME
         
-        documents_data = await self.query(query, parameters)
+        documents_data = await self.query(query, parameters, partition_key=opportunity_id)
         if not documents_data:
             return None
         
-        return Document(**documents_data[0])
+        return Document.model_validate(documents_data[0])
     
-    async def get_by_opportunity(self, opportunity_id: str) -> List[Document]:
-        """Get all documents for a specific opportunity_id"""
+    async def get_by_opportunity(self, opportunity_id: str, page: int = 1, limit: Optional[int] = None) -> List[Document]:
+        """Get all documents for a specific opportunity_id with optional pagination, processing_stages is not loaded"""
         
-        query = "SELECT * FROM c WHERE c.opportunity_id = @opportunity_id ORDER BY c.created_at DESC"
         parameters = [{"name": "@opportunity_id", "value": opportunity_id}]
+        query = self.paginate(_Q_BY_OPPORTUNITY, parameters, page, limit)
         
-        documents_data = await self.query(query, parameters)
-        return [Document(**doc) for doc in documents_data]
+        documents_data = await self.query(query, parameters, max_item_count=limit, partition_key=opportunity_id)
+        return _DOCUMENT_LIST_ADAPTER.validate_python(documents_data)
+    
+    async def iter_by_opportunity(self, opportunity_id: str) -> AsyncIterator[Document]:
+        """Stream the documents for a specific opportunity_id as they are read, processing_stages is not loaded"""
+        parameters = [{"name": "@opportunity_id", "value": opportunity_id}]
+        
+        async for item in self.iter_query(_Q_BY_OPPORTUNITY, parameters, partition_key=opportunity_id):
+            yield Document.model_validate(item)
     
     
     async def create_document(self, item: Document) -> Document:
@@ -51,7 +84,7 @@ class DocumentRepository(BaseRepository):
         
         _dict = item.model_dump(by_alias=True)
         _created = await self.create(_dict)
-        return Document(**_created)
+        return Document.model_validate(_created)
     
     
     async def update_document(
@@ -64,7 +97,7 @@ class DocumentRepository(BaseRepository):
 
         # Update the document
         updated_item = await self.update(document_id, updates, opportunity_id)
-        return Document(**updated_item)
+        return Document.model_validate(updated_item)
     
     async def delete_document(
         self,
@@ -72,22 +105,10 @@ class DocumentRepository(BaseRepository):
         opportunity_id: Optional[str] = None
     ) -> bool:
         """Delete a document"""
-        # Verify document exists and belongs to opportunity
-        existing = await self.get_by_id(document_id, opportunity_id)
-        if not existing:
-            return False
-        
-        # Hard delete document
-        result = await self.delete(document_id, opportunity_id)
-        return result
+        # Hard delete document, a missing document is reported by the delete itself
+        return await self.delete(document_id, opportunity_id)
     
     async def delete_documents_by_opportunity(self, opportunity_id: str) -> int:
         """Delete all documents for a specific opportunity"""
         documents = await self.get_by_opportunity(opportunity_id)
-        deleted_count = 0
-        
-        for doc in documents:
-            if await self.delete(doc.id, opportunity_id):
-                deleted_count += 1
-        
-        return deleted_count
+        return await self.delete_many([doc.id for doc in documents], opportunity_id)
@@ -1,9 +1,17 @@
 from typing import List, Optional, Dict, Any
+from pydantic import TypeAdapter
 from app.database.cosmos import CosmosDBClient
 from . import BaseRepository
 
 from app.models import Opportunity
 
+_OPPORTUNITY_LIST_ADAPTER = TypeAdapter(List[Opportunity])
+
+_Q_ALL = "SELECT * FROM c WHERE c.is_active = @is_active ORDER BY c.created_at DESC"
+_Q_ALL_BY_OWNER = "SELECT * FROM c WHERE c.is_active = @is_active AND c.owner_id = @owner_id ORDER BY c.created_at DESC"
+_Q_BY_OWNER = "SELECT * FROM c WHERE c.owner_id = @owner_id ORDER BY c.created_at DESC"
+
+
 class OpportunityRepository(BaseRepository):
     """Repository for Opportunity operations"""
     
@@ -16,43 +24,42 @@ class OpportunityRepository(BaseRepository):
         owner_id: Optional[str] = None
     ) -> List[Opportunity]:
         """Get all opportunities with optional filtering"""
-        query = "SELECT * FROM c WHERE c.is_active = @is_active"
         parameters = [{"name": "@is_active", "value": is_active}]
         
         if owner_id:
-            query += " AND c.owner_id = @owner_id"
+            query = _Q_ALL_BY_OWNER
             parameters.append({"name": "@owner_id", "value": owner_id})
+        else:
+            query = _Q_ALL
         
-        query += " ORDER BY c.created_at DESC"
-        
-        opportunities_data = await self.query(query, parameters)
-        return [Opportunity(**opportunity) for opportunity in opportunities_data]
+        opportunities_data = await self.query(query, parameters, partition_key=owner_id)
+        return _OPPORTUNITY_LIST_ADAPTER.validate_python(opportunities_data)
     
-    async def get_opportunity_by_id(self, opportunity_id: str, owner_id: Optional[str] = None) -> Optional[Opportunity]:
+    async def get_opportunity_by_id(self, opportunity_id: str, owner_id: str) -> Optional[Opportunity]:
         """Get a single opportunity by ID"""
         item = await self.get_by_id(opportunity_id, owner_id)
         
         if not item:
             return None
         
-        opportunity = Opportunity(**item)
+        opportunity = Opportunity.model_validate(item)
         
         return opportunity
     
-    async def get_by_owner(self, owner_id: str) -> List[Opportunity]:
-        """Get all opportunities for a specific owner"""
-        query = "SELECT * FROM c WHERE c.owner_id = @owner_id"
+    async def get_by_owner(self, owner_id: str, page: int = 1, limit: Optional[int] = None) -> List[Opportunity]:
+        """Get all opportunities for a specific owner with optional pagination"""
         parameters = [{"name": "@owner_id", "value": owner_id}]
+        query = self.paginate(_Q_BY_OWNER, parameters, page, limit)
         
-        opportunities_data = await self.query(query, parameters)
-        return [Opportunity(**opportunity) for opportunity in opportunities_data]
+        opportunities_data = await self.query(query, parameters, max_item_count=limit, partition_key=owner_id)
+        return _OPPORTUNITY_LIST_ADAPTER.validate_python(opportunities_data)
     
     async def create_opportunity(self, item: Opportunity) -> Opportunity:
         """Create a new opportunity"""
         
         _dict = item.model_dump(by_alias=True)
         _created = await self.create(_dict)
-        return Opportunity(**_created)
+        return Opportunity.model_validate(_created)
     
     async def update_opportunity(
         self,
@@ -61,14 +68,13 @@ class OpportunityRepository(BaseRepository):
         owner_id: Optional[str] = None
     ) -> Optional[Opportunity]:
         """Update an existing opportunity"""
-        # Verify opportunity exists and user has access
-        existing = await self.get_by_id(opportunity_id, owner_id)
-        if not existing:
+        # Update the opportunity, the owner is the partition key so a missing item also means no access
+        try:
+            updated_item = await self.update(opportunity_id, updates, owner_id)
+        except ValueError:
             return None
         
-        # Update the opportunity
-        updated_item = await self.update(opportunity_id, updates, owner_id)
-        return Opportunity(**updated_item)
+        return Opportunity.model_validate(updated_item)
     
     async def delete_opportunity(
         self,
@@ -77,16 +83,14 @@ class OpportunityRepository(BaseRepository):
         soft_delete: bool = True
     ) -> bool:
         """Delete an opportunity (soft delete by default)"""
-        # Verify opportunity exists and user has access
-        existing = await self.get_by_id(opportunity_id, owner_id)
-        if not existing:
-            return False
-        
+        # The owner is the partition key so a missing item also means no access
         if soft_delete:
             # Soft delete: mark as inactive
-            await self.update(opportunity_id, {"is_active": False}, opportunity_id)
-        else:
-            # Hard delete: remove from database
-            await self.delete(opportunity_id, opportunity_id)
+            try:
+                await self.update(opportunity_id, {"is_active": False}, owner_id)
+            except ValueError:
+                return False
+            return True
         
-        return True
+        # Hard delete: remove from database
+        return await self.delete(opportunity_id, owner_id)
@@ -1,8 +1,20 @@
 from typing import List, Optional, Dict, Any
+from pydantic import TypeAdapter
+from azure.cosmos.exceptions import CosmosAccessConditionFailedError
+import json
+
 from app.database.cosmos import CosmosDBClient
-from app.models import WhatIfMessage, WhatIfConversation
+from app.models import WhatIfMessage, WhatIfConversation, WhatIfConversationSummary
 from . import BaseRepository
 
+_SUMMARY_LIST_ADAPTER = TypeAdapter(List[WhatIfConversationSummary])
+
+_Q_CONVERSATIONS_BY_ANALYSIS = (
+    "SELECT c.id, c.user_id, c.conversation_id, c.analysis_id, c.title, c.created_at, c.updated_at "
+    "FROM c WHERE c.analysis_id = @analysis_id ORDER BY c.created_at ASC"
+)
+
+
 class WhatIfMessageRepository(BaseRepository):
     """Repository for WhatIfMessage operations"""
     
@@ -15,37 +27,32 @@ class WhatIfMessageRepository(BaseRepository):
         if not item:
             return None
         
-        return WhatIfConversation(**item)
+        return WhatIfConversation.model_validate(item)
     
     async def create_conversation(self, item: WhatIfConversation) -> WhatIfConversation:
         """Create a new conversation"""
         _dict = item.model_dump(by_alias=True)
         _created = await self.create(_dict)
-        return WhatIfConversation(**_created)
+        return WhatIfConversation.model_validate(_created)
     
     async def add_message_to_conversation(self, conversation_id: str, analysis_id: str, item: WhatIfMessage) -> WhatIfConversation:
         """Create a new chat message"""
-        conversation = await self.get_conversation_by_id(conversation_id, analysis_id)
-        if not conversation:
-            raise ValueError(f"Conversation with id {conversation_id} not found")
-        
-        conversation.messages.append(item)
-        updated_conversation = await self.update(conversation_id, conversation.model_dump(by_alias=True))
-        return WhatIfConversation(**updated_conversation)
+        return await self.add_message_batch_to_conversation(conversation_id, analysis_id, [item])
 
     
     async def add_message_batch_to_conversation(self, conversation_id: str, analysis_id: str, messages: List[WhatIfMessage]) -> WhatIfConversation:
-        """Create multiple chat messages in batch"""
-        conversation = await self.get_conversation_by_id(conversation_id, analysis_id)
-        if not conversation:
-            raise ValueError(f"Conversation with id {conversation_id} not found")
-        
-        for message in messages:
-            conversation.messages.append(message)
+        """Create multiple chat messages in batch, appending them without rewriting the conversation"""
+        patch_operations = [
+            {"op": "add", "path": "/messages/-", "value": message.model_dump(by_alias=True)}
+            for message in messages
+        ]
         
+        try:
+            updated_conversation = await self.patch(conversation_id, patch_operations, analysis_id)
+        except ValueError:
+            raise ValueError(f"Conversation with id {conversation_id} not found")
         
-        updated_conversation = await self.update(conversation_id, conversation.model_dump(by_alias=True), analysis_id)
-        return WhatIfConversation(**updated_conversation)
+        return WhatIfConversation.model_validate(updated_conversation)
     
     async def delete_message(
         self,
@@ -53,31 +60,42 @@ class WhatIfMessageRepository(BaseRepository):
         conversation_id: str,
         analysis_id: str
     ) -> bool:
-        """Delete a chat message"""
-        # Verify message exists
-        existing = await self.get_conversation_by_id(conversation_id, analysis_id)
-        if not existing:
-            return False
-        
-        existing.messages = [msg for msg in existing.messages if msg.msg_id != message_id]
+        """Delete a chat message, removing only that entry from the conversation"""
+        for _ in range(2):
+            existing = await self.get_conversation_by_id(conversation_id, analysis_id)
+            if not existing:
+                return False
+            
+            index = next((i for i, msg in enumerate(existing.messages) if msg.msg_id == message_id), None)
+            if index is None:
+                return True
+            
+            try:
+                # Only remove the entry if it is still the message at that position
+                await self.patch(
+                    conversation_id,
+                    [{"op": "remove", "path": f"/messages/{index}"}],
+                    analysis_id,
+                    filter_predicate=f"FROM c WHERE c.messages[{index}].msg_id = {json.dumps(message_id)}"
+                )
+                return True
+            except CosmosAccessConditionFailedError:
+                # Messages shifted since the read, locate the message again
+                continue
+            except ValueError:
+                return False
         
-        await self.update(conversation_id, existing.model_dump(by_alias=True), analysis_id)
-        return True
+        return False
     
     async def delete_conversation(self, conversation_id: str, analysis_id: str) -> bool:
         """Delete a specific conversation"""
         return await self.delete(conversation_id, analysis_id)
     
-    async def list_conversations(self, analysis_id: str, page: int = 1, limit: Optional[int] = 10) -> List[WhatIfConversation]:
-        """Get all conversations in the database with pagination"""
-        query = "SELECT * FROM c WHERE c.analysis_id = @analysis_id ORDER BY c.created_at ASC"
-        if limit:
-            query += f" OFFSET @offset LIMIT @limit"
-            offset = (page - 1) * limit
-            parameters = [{"name": "@limit", "value": limit}, {"name": "@offset", "value": offset}, {"name": "@analysis_id", "value": analysis_id}]
-        else:
-            parameters = [{"name": "@analysis_id", "value": analysis_id}]
+    async def list_conversations(self, analysis_id: str, page: int = 1, limit: Optional[int] = 10) -> List[WhatIfConversationSummary]:
+        """Get all conversations in the database with pagination, without their message history"""
+        parameters = [{"name": "@analysis_id", "value": analysis_id}]
+        query = self.paginate(_Q_CONVERSATIONS_BY_ANALYSIS, parameters, page, limit)
         
-        conversations_data = await self.query(query, parameters)
+        conversations_data = await self.query(query, parameters, partition_key=analysis_id)
         
-        return [WhatIfConversation(**conv) for conv in conversations_data]
\ No newline at end of file
+        return _SUMMARY_LIST_ADAPTER.validate_python(conversations_data)
\ No newline at end of file
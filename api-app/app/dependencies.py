@@ -1,17 +1,55 @@
+import asyncio
+import logging
 
-from agent_framework import BaseChatClient
+from fastapi import Depends
 
-from app.utils.credential import get_azure_credential, get_azure_credential_async
+from app.utils.credential import get_azure_credential_async
 from app.core.config import settings
 from app.database.cosmos import CosmosDBClient
+from app.database.repositories import WhatIfMessageRepository
+from app.services.opportunity_service import OpportunityService
+from app.services.analysis_service import AnalysisService
+from app.services.document_service import DocumentService
+from app.services.document_processing_service import DocumentProcessingService
+from app.services.analysis_workflow_events_service import AnalysisWorkflowEventsService
+from app.services.analysis_workflow_executor_service import AnalysisWorkflowExecutorService
+from app.services.whatif_workflow_executor_service import WhatIfWorkflowExecutorService
 from app.utils.sse_stream_event_queue import SSEStreamEventQueue
+from app.utils.blob_storage import get_blob_storage_service, close_blob_storage_service
+from app.utils.chat_client import get_chat_client, close_chat_client
+from app.utils.workflow_scheduler import WorkflowScheduler
+
+logger = logging.getLogger("app.dependencies")
 
 # Global Cosmos DB client instance
 cosmos_client: CosmosDBClient = None
 
+# Guards client creation against concurrent initialization
+_init_lock = asyncio.Lock()
+
+# Service singletons, created on first use and shared across requests
+_opportunity_service: OpportunityService = None
+_analysis_service: AnalysisService = None
+_document_service: DocumentService = None
+_document_processing_service: DocumentProcessingService = None
+_analysis_workflow_events_service: AnalysisWorkflowEventsService = None
+_analysis_workflow_execution_service: AnalysisWorkflowExecutorService = None
+_what_if_message_repository: WhatIfMessageRepository = None
+
 # Global event queue sessions
 _sse_event_queue_sessions: dict[str, SSEStreamEventQueue] = {}
 
+# Interval between keep-alive frames sent to every open SSE stream
+SSE_KEEP_ALIVE_INTERVAL_SECONDS = 30.0
+
+# Single task sending keep-alives for all SSE sessions
+_sse_heartbeat_task: asyncio.Task = None
+
+# Worker pools running workflow executions outside of the requests that start them,
+# chat turns get their own pool so they never wait behind long analysis runs
+_analysis_workflow_scheduler: WorkflowScheduler = None
+_chat_workflow_scheduler: WorkflowScheduler = None
+
 # Dependency to get database connection
 async def get_cosmos_client() -> CosmosDBClient:
     """Dependency to get Cosmos DB client"""
@@ -19,105 +57,187 @@ async def get_cosmos_client() -> CosmosDBClient:
     return cosmos_client
 
 async def get_opportunity_service():
-    """Dependency to get OpportunityService"""
-    from app.services.opportunity_service import OpportunityService
-    global cosmos_client
-    return OpportunityService(cosmos_client)
+    """Dependency to get the OpportunityService singleton"""
+    global _opportunity_service
+    if _opportunity_service is None:
+        _opportunity_service = OpportunityService(cosmos_client)
+    return _opportunity_service
 
 async def get_analysis_service():
-    """Dependency to get AnalysisService"""
-    from app.services.analysis_service import AnalysisService
-    global cosmos_client
-    return AnalysisService(cosmos_client)
-
-async def get_document_service():
-    """Dependency to get DocumentService"""
-    from app.services.document_service import DocumentService
-    from app.utils.blob_storage import get_blob_storage_service
-    global cosmos_client
-    blob_storage = await get_blob_storage_service()
-    return DocumentService(cosmos_client, blob_storage)
+    """Dependency to get the AnalysisService singleton"""
+    global _analysis_service
+    if _analysis_service is None:
+        _analysis_service = AnalysisService(cosmos_client)
+    return _analysis_service
+
+async def get_document_service(blob_storage=Depends(get_blob_storage_service)):
+    """Dependency to get the DocumentService singleton"""
+    global _document_service
+    if _document_service is None:
+        _document_service = DocumentService(cosmos_client, blob_storage)
+    return _document_service
 
 async def get_document_processing_service():
-    """Dependency to get DocumentProcessingService"""
-    from app.services.document_processing_service import DocumentProcessingService
-    global cosmos_client
-    return DocumentProcessingService(cosmos_client)
+    """Dependency to get the DocumentProcessingService singleton"""
+    global _document_processing_service
+    if _document_processing_service is None:
+        _document_processing_service = DocumentProcessingService(cosmos_client)
+    return _document_processing_service
 
 async def get_analysis_workflow_events_service():
-    """Dependency to get WorkflowEventsService"""
-    from app.services.analysis_workflow_events_service import AnalysisWorkflowEventsService
-    global cosmos_client
-    return AnalysisWorkflowEventsService(cosmos_client)
-
-async def get_analysis_workflow_execution_service():
-    """Dependency to get WorkflowEventsService"""
-    from app.services.analysis_workflow_executor_service import AnalysisWorkflowExecutorService
-    return AnalysisWorkflowExecutorService(analysis_service=await get_analysis_service(),
-                                           opportunity_service=await get_opportunity_service(),
-                                           workflow_events_service=await get_analysis_workflow_events_service())
+    """Dependency to get the WorkflowEventsService singleton"""
+    global _analysis_workflow_events_service
+    if _analysis_workflow_events_service is None:
+        _analysis_workflow_events_service = AnalysisWorkflowEventsService(cosmos_client)
+    return _analysis_workflow_events_service
+
+async def get_analysis_workflow_execution_service(analysis_service=Depends(get_analysis_service),
+                                                  opportunity_service=Depends(get_opportunity_service),
+                                                  workflow_events_service=Depends(get_analysis_workflow_events_service)):
+    """Dependency to get the AnalysisWorkflowExecutorService singleton"""
+    global _analysis_workflow_execution_service
+    if _analysis_workflow_execution_service is None:
+        _analysis_workflow_execution_service = AnalysisWorkflowExecutorService(analysis_service=analysis_service,
+                                                                               opportunity_service=opportunity_service,
+                                                                               workflow_events_service=workflow_events_service)
+    return _analysis_workflow_execution_service
 
 async def get_what_if_message_repository():
-    """Dependency to get WhatIfMessageRepository"""
-    from app.database.repositories import WhatIfMessageRepository
-    global cosmos_client
-    return WhatIfMessageRepository(cosmos_client)
-
-async def get_what_if_workflow_executor_service():
+    """Dependency to get the WhatIfMessageRepository singleton"""
+    global _what_if_message_repository
+    if _what_if_message_repository is None:
+        _what_if_message_repository = WhatIfMessageRepository(cosmos_client)
+    return _what_if_message_repository
+
+async def get_what_if_workflow_executor_service(analysis_service=Depends(get_analysis_service),
+                                                what_if_message_repository=Depends(get_what_if_message_repository)):
     """Dependency to get WhatIfWorkflowExecutorService"""
-    from app.services.whatif_workflow_executor_service import WhatIfWorkflowExecutorService
-    service = WhatIfWorkflowExecutorService(analysis_service=await get_analysis_service(), 
-                                            what_if_message_repository=await get_what_if_message_repository())
+    service = WhatIfWorkflowExecutorService(analysis_service=analysis_service, 
+                                            what_if_message_repository=what_if_message_repository)
     await service.initialize()
     return service
 
-async def get_sse_event_queue_for_session(session_id: str):
+async def _fail_abandoned_analysis(analysis_id: str, opportunity_id: str, **kwargs):
+    """Mark an analysis whose workflow was dropped by a shutdown as failed"""
+    analysis_service = await get_analysis_service()
+    await analysis_service.fail_analysis(
+        analysis_id=analysis_id,
+        opportunity_id=opportunity_id,
+        error_details={"error": "Analysis was interrupted by a server shutdown",
+                       "error_type": "WorkflowAbandoned"}
+    )
+
+async def get_analysis_workflow_scheduler() -> WorkflowScheduler:
+    """Dependency to get the WorkflowScheduler singleton for analysis workflows"""
+    global _analysis_workflow_scheduler
+    if _analysis_workflow_scheduler is None:
+        _analysis_workflow_scheduler = WorkflowScheduler(name="analysis-workflow",
+                                                         workers=settings.ANALYSIS_WORKFLOW_WORKERS,
+                                                         on_abandoned=_fail_abandoned_analysis)
+        _analysis_workflow_scheduler.start()
+    return _analysis_workflow_scheduler
+
+async def get_chat_workflow_scheduler() -> WorkflowScheduler:
+    """Dependency to get the WorkflowScheduler singleton for what-if chat workflows"""
+    global _chat_workflow_scheduler
+    if _chat_workflow_scheduler is None:
+        _chat_workflow_scheduler = WorkflowScheduler(name="chat-workflow",
+                                                     workers=settings.CHAT_WORKFLOW_WORKERS)
+        _chat_workflow_scheduler.start()
+    return _chat_workflow_scheduler
+
+def get_sse_event_queue_for_session(session_id: str) -> SSEStreamEventQueue:
     """Get the event queue for a specific session (alias for global queue)"""
-    from app.utils.sse_stream_event_queue import SSEStreamEventQueue
-    global _sse_event_queue_sessions
-    if session_id not in _sse_event_queue_sessions:
-        _sse_event_queue_sessions[session_id] = SSEStreamEventQueue()
-    return _sse_event_queue_sessions[session_id]
+    event_queue = _sse_event_queue_sessions.get(session_id)
+    if event_queue is None:
+        event_queue = _sse_event_queue_sessions.setdefault(session_id, SSEStreamEventQueue())
+    return event_queue
+
+def get_sse_event_queue_sessions() -> dict[str, SSEStreamEventQueue]:
+    """Get the registry of open SSE event queues keyed by session id"""
+    return _sse_event_queue_sessions
 
 async def close_sse_event_queue_for_session(session_id: str):
     """Close and remove the event queue for a specific session"""
-    global _sse_event_queue_sessions
-    if session_id in _sse_event_queue_sessions:
-        await _sse_event_queue_sessions[session_id].clear_event_queue()
-        del _sse_event_queue_sessions[session_id]
-
-async def get_chat_client() -> BaseChatClient:
-    """Dependency to get AzureOpenAIChatClient"""
-    from agent_framework.azure import AzureOpenAIChatClient
-    credential = get_azure_credential()
-    return AzureOpenAIChatClient(endpoint=settings.AZURE_OPENAI_ENDPOINT,
-                                 deployment_name=settings.AZURE_OPENAI_DEPLOYMENT_NAME,
-                                 credential=credential)
+    event_queue = _sse_event_queue_sessions.pop(session_id, None)
+    if event_queue is not None:
+        await event_queue.clear_event_queue()
+
+async def _sse_heartbeat_loop():
+    """Periodically wake the listeners of every SSE session to send a keep-alive frame"""
+    while True:
+        await asyncio.sleep(SSE_KEEP_ALIVE_INTERVAL_SECONDS)
+        for session_id, event_queue in list(_sse_event_queue_sessions.items()):
+            # One failing session must not stop keep-alives for the others
+            try:
+                await event_queue.send_keep_alive()
+            except Exception:
+                logger.exception("Failed to send keep-alive to SSE session %s", session_id)
 
 async def initialize_all():
     """Initialize all dependencies"""
-    print("Initializing dependencies...")
+    logger.info("Initializing dependencies...")
     try:
         global cosmos_client
         if not cosmos_client:
-            cosmos_client = CosmosDBClient(settings.COSMOS_DB_DATABASE_NAME, settings.COSMOS_DB_ENDPOINT, await get_azure_credential_async())
-            await cosmos_client.connect()
+            async with _init_lock:
+                # Another caller may have connected while this one waited for the lock
+                if not cosmos_client:
+                    client = CosmosDBClient(settings.COSMOS_DB_DATABASE_NAME, settings.COSMOS_DB_ENDPOINT, await get_azure_credential_async())
+                    await client.connect()
+                    cosmos_client = client
         
         # Initialize blob storage
-        from app.utils.blob_storage import get_blob_storage_service
         await get_blob_storage_service()
-    except Exception as e:
-        print(f"Error during dependencies initialization: {str(e)}")
-        print("Stack trace:")
-        import traceback
-        traceback.print_exc()
+        
+        # Create the chat client up front so the first workflow run does not pay for it
+        if settings.AZURE_OPENAI_ENDPOINT:
+            await get_chat_client()
+        
+        global _sse_heartbeat_task
+        if _sse_heartbeat_task is None:
+            _sse_heartbeat_task = asyncio.create_task(_sse_heartbeat_loop())
+        
+        await get_analysis_workflow_scheduler()
+        await get_chat_workflow_scheduler()
+    except Exception:
+        logger.exception("Dependencies init failed")
         raise
 
 async def close_all():
     """Close all dependencies"""
+    global _opportunity_service, _analysis_service, _document_service, _document_processing_service
+    global _analysis_workflow_events_service, _analysis_workflow_execution_service, _what_if_message_repository
+    global cosmos_client, _sse_heartbeat_task, _analysis_workflow_scheduler, _chat_workflow_scheduler
+    if _sse_heartbeat_task:
+        _sse_heartbeat_task.cancel()
+        _sse_heartbeat_task = None
+    
+    # Stop running workflows before the clients they use are closed, abandoned analyses are marked failed
+    if _analysis_workflow_scheduler:
+        await _analysis_workflow_scheduler.stop()
+        _analysis_workflow_scheduler = None
+    if _chat_workflow_scheduler:
+        await _chat_workflow_scheduler.stop()
+        _chat_workflow_scheduler = None
+    
     if cosmos_client:
         await cosmos_client.close()
+        cosmos_client = None
+    
+    # Services hold container proxies of the closed client
+    _opportunity_service = None
+    _analysis_service = None
+    _document_service = None
+    _document_processing_service = None
+    _analysis_workflow_events_service = None
+    _analysis_workflow_execution_service = None
+    _what_if_message_repository = None
+    await close_chat_client()
     
     # Close blob storage
-    from app.utils.blob_storage import close_blob_storage_service
     await close_blob_storage_service()
+    
+    # Drop any SSE sessions still open so their queues do not outlive the app
+    for session_id in list(_sse_event_queue_sessions):
+        await close_sse_event_queue_for_session(session_id)
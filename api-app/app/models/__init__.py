@@ -1,3 +1,4 @@
+import functools
 import importlib.metadata
 
 from ._base import CosmosBaseModel
@@ -7,11 +8,19 @@ from ._analysis import Analysis
 from ._opportunity import Opportunity
 from ._analysis_workflow_event import AnalysisWorkflowEvent
 from ._stream_event_message import StreamEventMessage
-from ._what_if_message import WhatIfMessage, WhatIfConversation
-try:
-    __version__ = importlib.metadata.version(__name__)
-except importlib.metadata.PackageNotFoundError:
-    __version__ = "0.0.0"  # Fallback for development mode
+from ._what_if_message import WhatIfMessage, WhatIfConversation, WhatIfConversationSummary
+@functools.cache
+def _get_version() -> str:
+    try:
+        return importlib.metadata.version(__name__)
+    except importlib.metadata.PackageNotFoundError:
+        return "0.0.0"  # Fallback for development mode
+
+def __getattr__(name: str):
+    # Resolve the package version on first access instead of at import
+    if name == "__version__":
+        return _get_version()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 __all__ = [
             "CosmosBaseModel", 
@@ -23,4 +32,5 @@ __all__ = [
             "StreamEventMessage",
             "WhatIfMessage",
             "WhatIfConversation",
+            "WhatIfConversationSummary",
           ]
\ No newline at end of file
@@ -3,6 +3,7 @@ from typing import Optional, List, Dict, Any, Union
 from datetime import datetime, timezone
 
 from . import CosmosBaseModel
+from ._base import InternedStr
 
 class Analysis(CosmosBaseModel):
     """Analysis model for Cosmos DB"""
@@ -10,7 +11,7 @@ class Analysis(CosmosBaseModel):
     tags: List[str] = []
     opportunity_id: str  # ID of the associated opportunity
     investment_hypothesis: Optional[str] = Field(default=None, description="Investment hypothesis for the analysis")
-    status: str = Field(default="pending", description="Status: pending, in_progress, completed, failed")
+    status: InternedStr = Field(default="pending", description="Status: pending, in_progress, completed, failed")
     agent_results: Dict[str, Any] = Field(default_factory=dict, description="Results from each agent")
     result: Optional[str] = Field(default=None, description="Final result summary of the analysis")
     started_at: Optional[str] = Field(default=None, description="Timestamp when the analysis started")
@@ -1,7 +1,12 @@
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import AfterValidator, BaseModel, ConfigDict, Field
+from typing import Annotated
 from datetime import datetime, timezone
+import sys
 import uuid
 
+# Low-cardinality strings (statuses, types) are interned so loaded documents share one copy
+InternedStr = Annotated[str, AfterValidator(sys.intern)]
+
 class CosmosBaseModel(BaseModel):
     """Base model for Cosmos DB documents"""
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -3,6 +3,7 @@ from typing import Optional, List, Dict, Any, Union, Literal
 from datetime import datetime, timezone
 
 from . import CosmosBaseModel
+from ._base import InternedStr
 
 # Processing status enum
 ProcessingStatus = Literal["pending", "processing", "completed", "error"]
@@ -14,8 +15,8 @@ class Document(CosmosBaseModel):
     opportunity_id: str  # ID of the associated opportunity
     opportunity_name: str  # Name of the associated opportunity
     file_url: str  # URL or path to the document file
-    file_type: str  # e.g., "pdf", "docx", etc.
-    mime_type: str  # e.g., "application/pdf", "application/vnd.openxmlformats-officedocument.wordprocessingml.document", etc.
+    file_type: InternedStr  # e.g., "pdf", "docx", etc.
+    mime_type: InternedStr  # e.g., "application/pdf", "application/vnd.openxmlformats-officedocument.wordprocessingml.document", etc.
     size: int  # Size of the document in bytes
     uploaded_at: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat(), description="Timestamp when the document was uploaded")
     uploaded_by: Optional[str] = Field(default=None, description="User ID of the uploader")
@@ -1,6 +1,6 @@
 from datetime import datetime, timezone
-import json
-from pydantic import BaseModel, Field
+import orjson
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr
 from typing import Optional, Any, Dict
 
 class StreamEventMessage(BaseModel):
@@ -12,9 +12,23 @@ class StreamEventMessage(BaseModel):
     message: Optional[str] = Field(None, description="Optional message")
     sequence: Optional[int] = Field(None, description="Sequence number of the event")
     correlation_id: Optional[str] = Field(None, description="Correlation ID associated with the event")
-    timestamp: Optional[str] = Field(datetime.now(timezone.utc).isoformat(), description="Timestamp of the event")
+    timestamp: Optional[str] = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat(), description="Timestamp of the event")
     additional_context: Optional[Dict[str, Any]] = Field(None, description="Additional context for the event")
     
+    # Encoded SSE frame, shared by every listener the event is fanned out to
+    _sse_payload: Optional[bytes] = PrivateAttr(default=None)
+    
+    model_config = ConfigDict(
+        extra="ignore",
+        populate_by_name=True,
+        validate_assignment=False
+    )
+    
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name != "_sse_payload":
+            self._sse_payload = None
+        super().__setattr__(name, value)
+    
     def to_dict(self) -> Dict[str, Any]:
         """Convert event to dictionary"""
         return {
@@ -27,8 +41,16 @@ class StreamEventMessage(BaseModel):
             "additional_context": self.additional_context
         }
     
-    def to_sse_format(self) -> str:
+    def to_sse_format(self) -> bytes:
         """Format event for SSE transmission"""
-        event_dict = self.to_dict()
-        data_json = json.dumps(event_dict)
-        return f"data: {data_json}\n\n"
\ No newline at end of file
+        if self._sse_payload is None:
+            data_json = orjson.dumps(self.to_dict(), default=_json_default, option=orjson.OPT_NON_STR_KEYS)
+            self._sse_payload = b"data: " + data_json + b"\n\n"
+        return self._sse_payload
+
+
+def _json_default(obj: Any) -> Any:
+    """Serialize nested payload objects that expose to_dict"""
+    if hasattr(obj, "to_dict"):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
\ No newline at end of file
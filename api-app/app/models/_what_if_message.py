@@ -34,4 +34,18 @@ class WhatIfConversation(CosmosBaseModel):
     model_config = ConfigDict(
         validate_by_name=True,
         populate_by_name=True
-    )
\ No newline at end of file
+    )
+
+
+class WhatIfConversationSummary(CosmosBaseModel):
+    """Conversation listing model for Cosmos DB, without the message history"""
+    
+    user_id: str = Field(..., description="User ID that owns this conversation")
+    conversation_id: str = Field(..., description="Conversation ID that this conversation belongs to")
+    analysis_id: str = Field(..., description="Analysis ID associated with this conversation")
+    title: Optional[str] = Field(None, description="Title of the conversation")
+    
+    model_config = ConfigDict(
+        validate_by_name=True,
+        populate_by_name=True
+    )
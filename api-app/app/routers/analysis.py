@@ -1,26 +1,41 @@
-from datetime import datetime, timezone
-from fastapi import APIRouter, Depends, HTTPException, status, Query, BackgroundTasks
-from fastapi.responses import StreamingResponse
-from typing import List, Optional, Dict, Any, AsyncGenerator
-from pydantic import BaseModel, ConfigDict, Field
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import Response, StreamingResponse
+from starlette.background import BackgroundTask
+from typing import List, Optional, Dict, Any, AsyncGenerator, AsyncIterable
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, ValidationError
 import logging
 import asyncio
 
 from app.core.auth import get_current_active_user
 from app.services import AnalysisService, AnalysisWorkflowEventsService, AnalysisWorkflowExecutorService
 from app.dependencies import (close_sse_event_queue_for_session, get_analysis_service, 
-                              get_sse_event_queue_for_session, 
+                              get_sse_event_queue_for_session, get_sse_event_queue_sessions,
                               get_analysis_workflow_execution_service, 
-                              get_analysis_workflow_events_service)
-from app.models import Analysis, User, AnalysisWorkflowEvent
+                              get_analysis_workflow_events_service, get_analysis_workflow_scheduler)
+from app.models import Analysis, User, AnalysisWorkflowEvent, StreamEventMessage
+from app.utils.sse_stream_event_queue import SSE_RESPONSE_HEADERS
+from app.utils.workflow_scheduler import WorkflowScheduler
 
 router = APIRouter(prefix="/analysis", tags=["analysis"])
 
 logger = logging.getLogger("app.routers.analysis")
 
+_EVENT_ADAPTER = TypeAdapter(AnalysisWorkflowEvent)
+
+
+def _assert_async_iter(content: AsyncIterable) -> AsyncIterable:
+    """Make sure streamed content is async, StreamingResponse iterates sync content in the threadpool"""
+    if not hasattr(content, "__aiter__"):
+        raise TypeError(f"Streaming content must be an async iterable, got {type(content).__name__}")
+    return content
+
 # region Request/Response Models
 
 class AnalysisResponse(BaseModel):
+    # Responses are built once and only read afterwards
+    model_config = ConfigDict(frozen=True, extra="ignore", populate_by_name=True)
+    
     id: str
     name: str
     tags: List[str] = []
@@ -39,33 +54,74 @@ class AnalysisResponse(BaseModel):
 
     @classmethod
     def from_analysis(cls, analysis: Analysis) -> "AnalysisResponse":
-        return cls(
-            id=analysis.id,
-            name=analysis.name,
-            tags=analysis.tags,
-            opportunity_id=analysis.opportunity_id,
-            investment_hypothesis=analysis.investment_hypothesis,
-            status=analysis.status,
-            agent_results=analysis.agent_results,
-            result=analysis.result,
-            started_at=analysis.started_at,
-            completed_at=analysis.completed_at,
-            owner_id=analysis.owner_id,
-            is_active=analysis.is_active,
-            error_details=analysis.error_details,
-            created_at=analysis.created_at,
-            updated_at=analysis.updated_at
-        )
+        # Analysis is already validated, copy its fields without validating them again
+        return cls.model_construct(**{field: getattr(analysis, field) for field in _ANALYSIS_RESPONSE_FIELDS})
+
+
+_ANALYSIS_RESPONSE_FIELDS = tuple(AnalysisResponse.model_fields)
+
+# Analysis lists are serialized straight from the stored models, limited to the response fields
+_ANALYSIS_LIST_ADAPTER = TypeAdapter(List[Analysis])
+_ANALYSIS_LIST_RESPONSE_INCLUDE = {"__all__": set(_ANALYSIS_RESPONSE_FIELDS)}
+
+
+def _analysis_response(analysis: Analysis, status_code: int = status.HTTP_200_OK) -> Response:
+    """Serialize the response for a single analysis, response_model still documents the schema"""
+    # Returning the response directly skips a second response_model validation pass
+    return Response(
+        content=AnalysisResponse.from_analysis(analysis).model_dump_json(),
+        media_type="application/json",
+        status_code=status_code
+    )
+
+
+def _analysis_list_response(analyses: List[Analysis]) -> Response:
+    """Serialize the responses for a list of analyses in one pass through pydantic-core"""
+    content = _ANALYSIS_LIST_ADAPTER.dump_json(analyses, include=_ANALYSIS_LIST_RESPONSE_INCLUDE)
+    # Returning the response directly skips a second response_model validation pass
+    return Response(content=content, media_type="application/json")
 
 
 class AnalysisCreateRequest(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     name: str = Field(..., description="Name for the analysis run")
     opportunity_id: str = Field(..., description="ID of the opportunity being analyzed")
     investment_hypothesis: Optional[str] = Field(None, description="Investment hypothesis for the analysis")
     tags: List[str] = Field(default_factory=list, description="Tags for categorization")
 
 
+async def _parse_analysis_create_request(http_request: Request) -> AnalysisCreateRequest:
+    """Validate the raw request body with pydantic-core's JSON parser instead of json.loads followed by validation"""
+    body = await http_request.body()
+    if not body:
+        raise RequestValidationError([{"type": "missing", "loc": ("body",), "msg": "Field required", "input": None}])
+    try:
+        return AnalysisCreateRequest.model_validate_json(body)
+    except ValidationError as e:
+        # Keep the error shape FastAPI produces for a declared body parameter
+        errors = []
+        for err in e.errors(include_url=False):
+            if err["type"] == "json_invalid":
+                errors.append({"type": "json_invalid", "loc": ("body", 0), "msg": "JSON decode error",
+                               "input": {}, "ctx": {"error": err.get("ctx", {}).get("error", err["msg"])}})
+            else:
+                errors.append({**err, "loc": ("body", *err["loc"])})
+        raise RequestValidationError(errors, body=body)
+
+
+# The body is read by _parse_analysis_create_request, so the schema has to be documented explicitly
+_ANALYSIS_CREATE_REQUEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {"application/json": {"schema": AnalysisCreateRequest.model_json_schema()}}
+    }
+}
+
+
 class AnalysisUpdateRequest(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     name: Optional[str] = Field(None, description="Name for the analysis run")
     investment_hypothesis: Optional[str] = Field(None, description="Investment hypothesis for the analysis")
     status: Optional[str] = Field(None, description="Status: pending, in_progress, completed, failed")
@@ -77,7 +133,7 @@ class AnalysisUpdateRequest(BaseModel):
 
 
 class AnalysisStartRequest(BaseModel):
-    pass  # No additional fields needed for starting
+    model_config = ConfigDict(frozen=True)  # No additional fields needed for starting
 
 
 # endregion
@@ -100,9 +156,9 @@ async def get_analyses(
             is_active=is_active,
             owner_id=current_user.email
         )
-        return [AnalysisResponse.from_analysis(analysis) for analysis in analyses]
+        return _analysis_list_response(analyses)
     except Exception as e:
-        logger.error(f"Error getting analyses: {str(e)}")
+        logger.exception("Error getting analyses: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to retrieve analyses: {str(e)}"
@@ -120,9 +176,9 @@ async def get_analyses_by_opportunity(
         analyses = await analysis_service.get_analyses_by_opportunity(opportunity_id)
         # Filter by owner
         #user_analyses = [a for a in analyses if a.owner_id == current_user.id]
-        return [AnalysisResponse.from_analysis(analysis) for analysis in analyses]
+        return _analysis_list_response(analyses)
     except Exception as e:
-        logger.error(f"Error getting analyses for opportunity {opportunity_id}: {str(e)}")
+        logger.exception("Error getting analyses for opportunity %s: %s", opportunity_id, e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to retrieve analyses: {str(e)}"
@@ -144,20 +200,21 @@ async def get_analysis(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Analysis {analysis_id} not found"
             )
-        return AnalysisResponse.from_analysis(analysis)
+        return _analysis_response(analysis)
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error getting analysis {analysis_id}: {str(e)}")
+        logger.exception("Error getting analysis %s: %s", analysis_id, e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to retrieve analysis: {str(e)}"
         )
 
 
-@router.post("/", response_model=AnalysisResponse, status_code=status.HTTP_201_CREATED)
+@router.post("/", response_model=AnalysisResponse, status_code=status.HTTP_201_CREATED,
+             openapi_extra=_ANALYSIS_CREATE_REQUEST_BODY)
 async def create_analysis(
-    request: AnalysisCreateRequest,
+    request: AnalysisCreateRequest = Depends(_parse_analysis_create_request),
     current_user: User = Depends(get_current_active_user),
     analysis_service: AnalysisService = Depends(get_analysis_service)
 ):
@@ -170,9 +227,9 @@ async def create_analysis(
             investment_hypothesis=request.investment_hypothesis,
             tags=request.tags
         )
-        return AnalysisResponse.from_analysis(analysis)
+        return _analysis_response(analysis, status_code=status.HTTP_201_CREATED)
     except Exception as e:
-        logger.error(f"Error creating analysis: {str(e)}")
+        logger.exception("Error creating analysis: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to create analysis: {str(e)}"
@@ -189,24 +246,23 @@ async def delete_analysis(
 ):
     """Delete an analysis"""
     try:
-        
-        # First delete associated workflow events
-        deleted_events_count = await workflow_events_service.delete_events_by_analysis(
-            analysis_id=analysis_id,
-            opportunity_id=opportunity_id,
-            owner_id=current_user.email,
-            soft_delete=soft_delete
-        )
-        logger.debug(f"Deleted {deleted_events_count} events for analysis {analysis_id}")
-        
-        # Now delete the analysis itself
-        deleted = await analysis_service.delete_analysis(
-            analysis_id=analysis_id,
-            opportunity_id=opportunity_id,
-            owner_id=current_user.email,
-            soft_delete=soft_delete
+        # Events and the analysis live in different containers, so delete both concurrently
+        deleted_events_count, deleted = await asyncio.gather(
+            workflow_events_service.delete_events_by_analysis(
+                analysis_id=analysis_id,
+                opportunity_id=opportunity_id,
+                owner_id=current_user.email,
+                soft_delete=soft_delete
+            ),
+            analysis_service.delete_analysis(
+                analysis_id=analysis_id,
+                opportunity_id=opportunity_id,
+                owner_id=current_user.email,
+                soft_delete=soft_delete
+            )
         )
-        logger.debug(f"Analysis {analysis_id} deletion status: {deleted}")
+        logger.debug("Deleted %s events for analysis %s", deleted_events_count, analysis_id)
+        logger.debug("Analysis %s deletion status: %s", analysis_id, deleted)
         
         if not deleted:
             raise HTTPException(
@@ -216,7 +272,7 @@ async def delete_analysis(
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error deleting analysis {analysis_id}: {str(e)}")
+        logger.exception("Error deleting analysis %s: %s", analysis_id, e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to delete analysis: {str(e)}"
@@ -231,10 +287,10 @@ async def start_analysis(
     client_id: str, # path param for session identification, used for creating a distinct event queue. In production this could be a user session ID or similar.
     opportunity_id: str,
     analysis_id: str,
-    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_active_user),
     analysis_service: AnalysisService = Depends(get_analysis_service),
     execution_service: AnalysisWorkflowExecutorService = Depends(get_analysis_workflow_execution_service),
+    workflow_scheduler: WorkflowScheduler = Depends(get_analysis_workflow_scheduler),
 ):
     """Start an analysis run with background workflow execution"""
     try:
@@ -244,8 +300,8 @@ async def start_analysis(
                 detail="client_id path parameter is required for event streaming"
             )
         
-        # Mark analysis as started
-        analysis = await analysis_service.start_analysis(
+        # Mark analysis as queued, the worker marks it in progress once the workflow actually starts
+        analysis = await analysis_service.queue_analysis(
             analysis_id=analysis_id,
             opportunity_id=opportunity_id,
             owner_id=current_user.email
@@ -257,11 +313,14 @@ async def start_analysis(
             )
         
         # Get the event queue for this client/session
-        sse_event_queue = await get_sse_event_queue_for_session(client_id)
+        sse_event_queue = get_sse_event_queue_for_session(client_id)
+        sse_event_queue.opportunity_id = opportunity_id
+        sse_event_queue.analysis_id = analysis_id
+        sse_event_queue.owner_id = current_user.email
         
-        # Execute workflow in background
+        # Execute workflow on the analysis scheduler's worker pool
         workflow_executor_function = execution_service.execute_workflow
-        background_tasks.add_task(
+        await workflow_scheduler.submit(
             workflow_executor_function,
             sse_event_queue=sse_event_queue,
             analysis_id=analysis_id,
@@ -269,13 +328,13 @@ async def start_analysis(
             owner_id=current_user.email
         )
         
-        logger.info(f"Started background workflow for analysis {analysis_id}")
+        logger.info("Started background workflow for analysis %s", analysis_id)
         
-        return AnalysisResponse.from_analysis(analysis)
+        return _analysis_response(analysis)
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error starting analysis {analysis_id}: {str(e)}")
+        logger.exception("Error starting analysis %s: %s", analysis_id, e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to start analysis: {str(e)}"
@@ -304,91 +363,63 @@ async def stream_analysis_events(
                 detail="client_id path parameter is required for event streaming"
             )
         
-        # Verify the analysis exists and user has access
-        analysis = await analysis_service.get_analysis_by_id(
-            analysis_id=analysis_id,
-            opportunity_id=opportunity_id,
-            owner_id=current_user.email
-        )
-        if not analysis:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Analysis {analysis_id} not found"
+        # A queue created by start_analysis was already verified for this analysis and user
+        existing_queue = get_sse_event_queue_sessions().get(client_id)
+        if (existing_queue is None
+                or existing_queue.opportunity_id != opportunity_id
+                or existing_queue.analysis_id != analysis_id
+                or existing_queue.owner_id != current_user.email):
+            # Verify the analysis exists and user has access
+            analysis = await analysis_service.get_analysis_by_id(
+                analysis_id=analysis_id,
+                opportunity_id=opportunity_id,
+                owner_id=current_user.email
             )
+            if not analysis:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Analysis {analysis_id} not found"
+                )
         
         # Get the event queue for this client/session
-        sse_event_queue = await get_sse_event_queue_for_session(client_id)
-        
-        async def clean_up():
-            logger.info(f"Cleaning up event stream for analysis {analysis_id} and client {client_id}")
-            await close_sse_event_queue_for_session(client_id)
+        sse_event_queue = get_sse_event_queue_for_session(client_id)
         
-        async def event_generator() -> AsyncGenerator[str, None]:
+        async def event_generator() -> AsyncGenerator[bytes, None]:
             """Generate SSE events for the analysis"""
             
             try:
-                # First, send any historical events (if reconnecting)
                 if since_sequence is not None:
-                    logger.info(f"Client reconnecting to analysis {analysis_id}, fetching events since {since_sequence}")
-                    historical_events = await sse_event_queue.get_events(
-                        since_sequence=since_sequence
-                    )
-                    for event in historical_events:
-                        yield event.to_sse_format()
-                else:
-                    # Send all existing events
-                    all_events = await sse_event_queue.get_events()
-                    for event in all_events:
-                        yield event.to_sse_format()
+                    logger.info("Client reconnecting to analysis %s, fetching events since %s", analysis_id, since_sequence)
                 
-                # Register for live updates
-                listener_queue = await sse_event_queue.register_listener()
-                
-                try:
-                    # Stream live events
-                    while True:
-                        try:
-                            # Wait for new events with timeout to allow for keep-alive
-                            event = await asyncio.wait_for(listener_queue.get(), timeout=30.0)
-                            yield event.to_sse_format()
-                            
-                        except asyncio.TimeoutError:
-                            # Send keep-alive comment to prevent connection timeout
-                            yield ": keep-alive\n\n"
-                            
-                except asyncio.CancelledError:
-                    logger.info(f"Client disconnected from analysis {analysis_id} event stream")
-                    raise
-                finally:
-                    # Cleanup listener
-                    await sse_event_queue.unregister_listener(listener_queue)
+                # Replay the events already emitted, then stream live events and keep-alives
+                async for frame in sse_event_queue.listen(since_sequence=since_sequence):
+                    yield frame
                     
+            except asyncio.CancelledError:
+                logger.info("Client disconnected from analysis %s event stream", analysis_id)
+                raise
             except Exception as e:
-                logger.error(f"Error in event stream for analysis {analysis_id}: {str(e)}")
-                logger.exception(e)
+                logger.exception("Error in event stream for analysis %s: %s", analysis_id, e)
                 # Send error event
-                error_data = f'data: {{"type": "error", "message": "Stream error: {str(e)}", "data":  {{"error": "{str(e)}", "error_type": "{type(e).__name__}"}} , "timestamp": "{datetime.now(timezone.utc).isoformat()}"}}\n\n'
-                yield error_data
-                
-            finally:
-                await clean_up()
+                error_event = StreamEventMessage(
+                    type="error",
+                    message=f"Stream error: {str(e)}",
+                    data={"error": str(e), "error_type": type(e).__name__}
+                )
+                yield error_event.to_sse_format()
         
+        # Tear the session queue down once the connection is closed, not while the last frame is sent
         return StreamingResponse(
-            event_generator(),
+            _assert_async_iter(event_generator()),
             media_type="text/event-stream",
-            headers={
-                "Cache-Control": "no-cache",
-                "Connection": "keep-alive",
-                "X-Accel-Buffering": "no",  # Disable buffering in nginx
-                "Access-Control-Allow-Origin": "*",  # Allow CORS for SSE
-                "Access-Control-Allow-Credentials": "true"
-            }
+            background=BackgroundTask(close_sse_event_queue_for_session, client_id),
+            headers=SSE_RESPONSE_HEADERS
         )
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error setting up event stream for analysis {analysis_id}: {str(e)}")
+        logger.exception("Error setting up event stream for analysis %s: %s", analysis_id, e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to setup event stream: {str(e)}"
@@ -402,18 +433,31 @@ async def fetch_analysis_events(
     current_user: User = Depends(get_current_active_user),
     workflow_events_service: AnalysisWorkflowEventsService = Depends(get_analysis_workflow_events_service),
 ):
-    """Fetch all events for a specific analysis"""
+    """Fetch all events for a specific analysis, streamed as a JSON array while they are read"""
     
     try:
-        events = await workflow_events_service.get_events_by_analysis(analysis_id=analysis_id, 
-                                                                      opportunity_id=opportunity_id, 
-                                                                      owner_id=current_user.email)
+        events = workflow_events_service.iter_events_by_analysis(analysis_id=analysis_id, 
+                                                                 opportunity_id=opportunity_id, 
+                                                                 owner_id=current_user.email)
+        
+        # Read the first event up front so a failing query is still reported as an error status
+        first_event = await anext(events, None)
+        
+        async def json_array_stream() -> AsyncGenerator[bytes, None]:
+            if first_event is None:
+                yield b"[]"
+                return
+            
+            yield b"[" + _EVENT_ADAPTER.dump_json(first_event, by_alias=True)
+            async for event in events:
+                yield b"," + _EVENT_ADAPTER.dump_json(event, by_alias=True)
+            yield b"]"
     
-        return events
+        return StreamingResponse(_assert_async_iter(json_array_stream()), media_type="application/json")
     except HTTPException:
             raise
     except Exception as e:
-        logger.error(f"Error fetching events for analysis {analysis_id}: {str(e)}")
+        logger.exception("Error fetching events for analysis %s: %s", analysis_id, e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to fetch events for analysis: {str(e)}"
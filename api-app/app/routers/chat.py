@@ -6,16 +6,19 @@ import json
 import uuid
 from datetime import datetime, timezone
 from typing import List, Dict, Any, Optional, AsyncGenerator
-from fastapi import APIRouter, Depends, BackgroundTasks, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from pydantic import BaseModel, Field
 
 from app.core.auth import get_current_active_user
 from app.services import AnalysisService, WhatIfWorkflowExecutorService
 from app.dependencies import (close_sse_event_queue_for_session, get_analysis_service, 
                               get_sse_event_queue_for_session, 
-                              get_what_if_workflow_executor_service)
-from app.models import User
+                              get_what_if_workflow_executor_service, get_chat_workflow_scheduler)
+from app.models import User, StreamEventMessage
+from app.utils.sse_stream_event_queue import SSE_RESPONSE_HEADERS
+from app.utils.workflow_scheduler import WorkflowScheduler
 
 router = APIRouter(prefix="/chat", tags=["chat"])
 
@@ -193,9 +196,9 @@ class ChatResponse(BaseModel):
 @router.post("/stream", response_model=StreamInitResponse)
 async def initiate_stream(
     request: ChatMessageRequest,
-    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_active_user),
-    execution_service: WhatIfWorkflowExecutorService = Depends(get_what_if_workflow_executor_service),):
+    execution_service: WhatIfWorkflowExecutorService = Depends(get_what_if_workflow_executor_service),
+    workflow_scheduler: WorkflowScheduler = Depends(get_chat_workflow_scheduler),):
     """
     Initiate a streaming chat session
     Returns a stream ID that can be used to connect to the SSE endpoint
@@ -216,11 +219,11 @@ async def initiate_stream(
     }
     
     # Get the event queue for this client/session
-    event_queue = await get_sse_event_queue_for_session(stream_id)
+    event_queue = get_sse_event_queue_for_session(stream_id)
     
-    # Execute workflow in background
+    # Execute workflow on the chat scheduler's worker pool
     workflow_executor_function = execution_service.execute_workflow
-    background_tasks.add_task(
+    await workflow_scheduler.submit(
             workflow_executor_function,
             input_message=request.message,
             conversation_id=conversation_id,
@@ -249,58 +252,32 @@ async def stream_response(stream_id: str):
     # stream_data = active_streams[stream_id]
     
     # Get the event queue for this client/session
-    event_queue = await get_sse_event_queue_for_session(stream_id)
+    event_queue = get_sse_event_queue_for_session(stream_id)
         
-    async def clean_up():
-        await close_sse_event_queue_for_session(stream_id)
-    
-    async def event_generator() -> AsyncGenerator[str, None]:
+    async def event_generator() -> AsyncGenerator[bytes, None]:
                 
         try:
-            # Send all existing events
-            all_events = await event_queue.get_events()
-            for event in all_events:
-                yield event.to_sse_format()
-                
-            # Register for live updates
-            listener_queue = await event_queue.register_listener()
-                
-            try:
-                # Stream live events
-                while True:
-                    try:
-                        # Wait for new events with timeout to allow for keep-alive
-                        event = await asyncio.wait_for(listener_queue.get(), timeout=30.0)
-                        yield event.to_sse_format()
-                            
-                    except asyncio.TimeoutError:
-                        # Send keep-alive comment to prevent connection timeout
-                        yield ": keep-alive\n\n"
-                            
-            except asyncio.CancelledError:
-                raise
-            finally:
-                # Cleanup listener
-                await event_queue.unregister_listener(listener_queue)
+            # Replay the events already emitted, then stream live events and keep-alives
+            async for frame in event_queue.listen():
+                yield frame
                     
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
             # Send error event
-            error_data = f'data: {{"type": "error", "message": "Stream error: {str(e)}", "data":  {{"error": "{str(e)}", "error_type": "{type(e).__name__}"}} , "timestamp": "{datetime.now(timezone.utc).isoformat()}"}}\n\n'
-            yield error_data
-                
-        finally:
-            await clean_up()
+            error_event = StreamEventMessage(
+                type="error",
+                message=f"Stream error: {str(e)}",
+                data={"error": str(e), "error_type": type(e).__name__}
+            )
+            yield error_event.to_sse_format()
     
+    # Tear the session queue down once the connection is closed, not while the last frame is sent
     return StreamingResponse(
             event_generator(),
             media_type="text/event-stream",
-            headers={
-                "Cache-Control": "no-cache",
-                "Connection": "keep-alive",
-                "X-Accel-Buffering": "no",  # Disable buffering in nginx
-                "Access-Control-Allow-Origin": "*",  # Allow CORS for SSE
-                "Access-Control-Allow-Credentials": "true"
-            }
+            background=BackgroundTask(close_sse_event_queue_for_session, stream_id),
+            headers=SSE_RESPONSE_HEADERS
         )
 
 
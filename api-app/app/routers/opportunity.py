@@ -1,9 +1,10 @@
 from fastapi import APIRouter, Depends, Form, HTTPException, status, Query, UploadFile, File, Request
-from fastapi.responses import StreamingResponse
+from fastapi.responses import Response, StreamingResponse
 from typing import Annotated, List, Optional, Dict, Any
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
 import os
 import logging
+import asyncio
 
 from app.core.auth import get_current_active_user
 from app.services.opportunity_service import OpportunityService
@@ -11,11 +12,21 @@ from app.services.document_service import DocumentService
 from app.services.document_processing_service import DocumentProcessingService
 from app.dependencies import get_opportunity_service, get_document_service, get_document_processing_service
 from app.models import Opportunity, Document, User
+from app.utils.sse_stream_event_queue import SSE_RESPONSE_HEADERS, batch_sse_frames
 
 router = APIRouter(prefix="/opportunity", tags=["opportunity"])
 
 logger = logging.getLogger("app.routers.opportunity")
 
+# Number of files of one upload request sent to blob storage at the same time
+MAX_CONCURRENT_UPLOADS = 8
+
+# Upload limits, the error message parts are built once at import
+_ALLOWED_EXTENSIONS: frozenset[str] = frozenset({'.pdf', '.doc', '.docx', '.xls', '.xlsx', '.csv', '.txt'})
+_ALLOWED_EXT_MSG = ", ".join(sorted(_ALLOWED_EXTENSIONS))
+_MAX_UPLOAD_BYTES = 100 * 1024 * 1024  # 100MB per file
+_MAX_UPLOAD_MB = _MAX_UPLOAD_BYTES / (1024 * 1024)
+
 # region Models
 
 class OpportunityResponse(BaseModel):
@@ -31,17 +42,15 @@ class OpportunityResponse(BaseModel):
 
     @classmethod
     def from_opportunity(cls, opportunity: Opportunity) -> "OpportunityResponse":
-        return cls(
-            id=opportunity.id,
-            name=opportunity.name,
-            display_name=opportunity.display_name,
-            description=opportunity.description,
-            owner_id=opportunity.owner_id,
-            settings=opportunity.settings,
-            is_active=opportunity.is_active,
-            created_at=opportunity.created_at,
-            updated_at=opportunity.updated_at
-        )
+        # Opportunity is already validated, copy its fields without validating them again
+        return cls.model_construct(**{field: getattr(opportunity, field) for field in _OPPORTUNITY_RESPONSE_FIELDS})
+
+
+_OPPORTUNITY_RESPONSE_FIELDS = tuple(OpportunityResponse.model_fields)
+
+# Opportunity lists are serialized straight from the stored models, limited to the response fields
+_OPPORTUNITY_LIST_ADAPTER = TypeAdapter(List[Opportunity])
+_OPPORTUNITY_LIST_RESPONSE_INCLUDE = {"__all__": set(_OPPORTUNITY_RESPONSE_FIELDS)}
 
 
 class OpportunityCreateRequest(BaseModel):
@@ -80,25 +89,15 @@ class DocumentResponse(BaseModel):
 
     @classmethod
     def from_document(cls, document: Document) -> "DocumentResponse":
-        return cls(
-            id=document.id,
-            name=document.name,
-            tags=document.tags,
-            opportunity_id=document.opportunity_id,
-            file_url=document.file_url,
-            file_type=document.file_type,
-            mime_type=document.mime_type,
-            size=document.size,
-            uploaded_at=document.uploaded_at,
-            uploaded_by=document.uploaded_by,
-            created_at=document.created_at,
-            updated_at=document.updated_at,
-            processing_status=document.processing_status,
-            processing_progress=document.processing_progress,
-            processing_started_at=document.processing_started_at,
-            processing_completed_at=document.processing_completed_at,
-            processing_error=document.processing_error
-        )
+        # Document is already validated, copy its fields without validating them again
+        return cls.model_construct(**{field: getattr(document, field) for field in _DOCUMENT_RESPONSE_FIELDS})
+
+
+_DOCUMENT_RESPONSE_FIELDS = tuple(DocumentResponse.model_fields)
+
+# Document lists are serialized straight from the stored models, limited to the response fields
+_DOCUMENT_LIST_ADAPTER = TypeAdapter(List[Document])
+_DOCUMENT_LIST_RESPONSE_INCLUDE = {"__all__": set(_DOCUMENT_RESPONSE_FIELDS)}
 
 
 class DocumentCreateRequest(BaseModel):
@@ -127,6 +126,20 @@ class ProcessingJobResponse(BaseModel):
     started_at: str
 
 
+def _opportunity_list_response(opportunities: List[Opportunity]) -> Response:
+    """Serialize the responses for a list of opportunities in one pass through pydantic-core"""
+    content = _OPPORTUNITY_LIST_ADAPTER.dump_json(opportunities, include=_OPPORTUNITY_LIST_RESPONSE_INCLUDE)
+    # Returning the response directly skips a second response_model validation pass
+    return Response(content=content, media_type="application/json")
+
+
+def _document_list_response(documents: List[Document]) -> Response:
+    """Serialize the responses for a list of documents in one pass through pydantic-core"""
+    content = _DOCUMENT_LIST_ADAPTER.dump_json(documents, include=_DOCUMENT_LIST_RESPONSE_INCLUDE)
+    # Returning the response directly skips a second response_model validation pass
+    return Response(content=content, media_type="application/json")
+
+
 # endregion
 
 # region Endpoints
@@ -140,7 +153,7 @@ async def get_opportunities(
     """Get all opportunities with optional filtering"""
     try:
         opportunities = await opportunity_service.get_opportunities(is_active=is_active, owner_id=current_user.email)
-        return [OpportunityResponse.from_opportunity(opportunity) for opportunity in opportunities]
+        return _opportunity_list_response(opportunities)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -277,7 +290,7 @@ async def get_opportunity_documents(
 ):
     """Get all documents for a specific opportunity"""
     try:
-        # Verify user has access to the opportunity
+        # Verify user has access to the opportunity before reading its documents
         opportunity = await opportunity_service.get_opportunity_by_id(opportunity_id, owner_id=current_user.email)
         if not opportunity:
             raise HTTPException(
@@ -286,7 +299,7 @@ async def get_opportunity_documents(
             )
         
         documents = await document_service.get_documents_by_opportunity(opportunity_id)
-        return [DocumentResponse.from_document(doc) for doc in documents]
+        return _document_list_response(documents)
     except HTTPException:
         raise
     except Exception as e:
@@ -306,7 +319,7 @@ async def get_opportunity_document(
 ):
     """Get a specific document for an opportunity"""
     try:
-        # Verify user has access to the opportunity
+        # Verify user has access to the opportunity before reading its documents
         opportunity = await opportunity_service.get_opportunity_by_id(opportunity_id, owner_id=current_user.email)
         if not opportunity:
             raise HTTPException(
@@ -370,91 +383,91 @@ async def upload_opportunity_documents_with_metadata(
         # Parse form data manually to handle files and tags
         form = await request.form()
         
-        print("In function: upload_opportunity_documents_with_metadata")
-        print(form)
-        
-        # Extract files
-        files = form.getlist("files")
-        if not files or len(files) == 0:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="No files provided"
-            )
-        
-        # Extract tags for each file
+        # Collect files and the tags of each file in one pass over the form
+        files = []
         tags_dict = {}
-        for key, value in form.items():
-            if key.startswith("tags_"):
+        for key, value in form.multi_items():
+            if key == "files":
+                files.append(value)
+            elif key.startswith("tags_"):
                 try:
-                    index = int(key.split("_")[1])
+                    index = int(key[5:])
                     # Parse comma-separated tags
                     tags_dict[index] = [tag.strip() for tag in value.split(',') if tag.strip()]
-                except (IndexError, ValueError):
+                except ValueError:
                     logger.warning(f"Invalid tag field format: {key}")
         
-        # Allowed file extensions
-        allowed_extensions = {'.pdf', '.doc', '.docx', '.xls', '.xlsx', '.csv', '.txt'}
-        max_size = 100 * 1024 * 1024  # 100MB per file
+        if not files:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="No files provided"
+            )
         
-        uploaded_documents = []
-        errors = []
+        upload_semaphore = asyncio.Semaphore(MAX_CONCURRENT_UPLOADS)
         
-        # Process each file
-        for idx, file in enumerate(files):
+        async def upload_file(idx: int, file) -> Dict[str, Any]:
+            """Validate and upload one file, returns the created document or the error for that file"""
             try:
-                # Validate file has a filename
-                if not hasattr(file, 'filename') or not file.filename:
-                    errors.append({
+                # Validate file has a filename, plain text form values are not files
+                if isinstance(file, str) or not file.filename:
+                    return {"error": {
                         "file_index": idx,
                         "filename": "unknown",
                         "error": "No filename provided"
-                    })
-                    continue
+                    }}
                 
                 # Validate file extension
                 file_ext = os.path.splitext(file.filename)[1].lower()
-                if file_ext not in allowed_extensions:
-                    errors.append({
+                if file_ext not in _ALLOWED_EXTENSIONS:
+                    return {"error": {
                         "file_index": idx,
                         "filename": file.filename,
-                        "error": f"File type {file_ext} not allowed. Allowed types: {', '.join(allowed_extensions)}"
-                    })
-                    continue
+                        "error": f"File type {file_ext} not allowed. Allowed types: {_ALLOWED_EXT_MSG}"
+                    }}
                 
-                # Read file content
-                file_content = await file.read()
+                async with upload_semaphore:
+                    # Size the spooled upload without reading it into memory
+                    file_size = file.size
+                    if file_size is None:
+                        file_size = file.file.seek(0, os.SEEK_END)
+                    await file.seek(0)
+                    
+                    # Validate file size
+                    if file_size > _MAX_UPLOAD_BYTES:
+                        return {"error": {
+                            "file_index": idx,
+                            "filename": file.filename,
+                            "error": f"File size {file_size / (1024 * 1024):.2f}MB exceeds maximum allowed size of {_MAX_UPLOAD_MB}MB"
+                        }}
+                    
+                    # Get tags for this specific file
+                    tag_list = tags_dict.get(idx, [])
+                    
+                    # Upload document
+                    document = await document_service.upload_document_stream(
+                        file_obj=file.file,
+                        size=file_size,
+                        filename=file.filename,
+                        opportunity_id=opportunity.id,
+                        opportunity_name=opportunity.name,
+                        content_type=file.content_type,
+                        uploaded_by=current_user.email,
+                        tags=tag_list
+                    )
                 
-                # Validate file size
-                if len(file_content) > max_size:
-                    errors.append({
-                        "file_index": idx,
-                        "filename": file.filename,
-                        "error": f"File size {len(file_content) / (1024 * 1024):.2f}MB exceeds maximum allowed size of {max_size / (1024 * 1024)}MB"
-                    })
-                    continue
-                
-                # Get tags for this specific file
-                tag_list = tags_dict.get(idx, [])
-                
-                # Upload document
-                document = await document_service.upload_document(
-                    file_content=file_content,
-                    filename=file.filename,
-                    opportunity_id=opportunity.id,
-                    opportunity_name=opportunity.name,
-                    content_type=getattr(file, 'content_type', None),
-                    uploaded_by=current_user.email,
-                    tags=tag_list
-                )
-                
-                uploaded_documents.append(document)
+                return {"document": document}
                 
             except Exception as file_error:
-                errors.append({
+                return {"error": {
                     "file_index": idx,
-                    "filename": file.filename if hasattr(file, 'filename') else "unknown",
+                    "filename": file.filename or "unknown",
                     "error": str(file_error)
-                })
+                }}
+        
+        # Process the files concurrently, results keep the order of the files
+        results = await asyncio.gather(*(upload_file(idx, file) for idx, file in enumerate(files)))
+        uploaded_documents = [result["document"] for result in results if "document" in result]
+        errors = [result["error"] for result in results if "error" in result]
         
         # If no files were successfully uploaded, return error
         if len(uploaded_documents) == 0:
@@ -704,16 +717,12 @@ async def stream_document_processing(
         
         # Return SSE stream
         return StreamingResponse(
-            processing_service.process_documents_stream(
+            batch_sse_frames(processing_service.process_documents_stream(
                 document_ids=doc_id_list,
                 opportunity_id=opportunity_id
-            ),
+            )),
             media_type="text/event-stream",
-            headers={
-                "Cache-Control": "no-cache",
-                "Connection": "keep-alive",
-                "X-Accel-Buffering": "no"  # Disable buffering for nginx
-            }
+            headers=SSE_RESPONSE_HEADERS
         )
         
     except HTTPException:
@@ -735,7 +744,7 @@ async def get_document_processing_status(
 ):
     """Get the current processing status of a document"""
     try:
-        # Verify user has access to the opportunity
+        # Verify user has access to the opportunity before reading its documents
         opportunity = await opportunity_service.get_opportunity_by_id(opportunity_id, owner_id=current_user.email)
         if not opportunity:
             raise HTTPException(
@@ -774,7 +783,7 @@ async def get_processing_statistics(
 ):
     """Get processing statistics for all documents in an opportunity"""
     try:
-        # Verify user has access to the opportunity
+        # Verify user has access to the opportunity before reading its documents
         opportunity = await opportunity_service.get_opportunity_by_id(opportunity_id, owner_id=current_user.email)
         if not opportunity:
             raise HTTPException(
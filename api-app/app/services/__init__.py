@@ -1,3 +1,4 @@
+import functools
 import importlib.metadata
 
 from .analysis_service import AnalysisService
@@ -9,10 +10,18 @@ from .analysis_workflow_events_service import AnalysisWorkflowEventsService
 from .analysis_workflow_executor_service import AnalysisWorkflowExecutorService
 from .whatif_workflow_executor_service import WhatIfWorkflowExecutorService
 
-try:
-    __version__ = importlib.metadata.version(__name__)
-except importlib.metadata.PackageNotFoundError:
-    __version__ = "0.0.0"  # Fallback for development mode
+@functools.cache
+def _get_version() -> str:
+    try:
+        return importlib.metadata.version(__name__)
+    except importlib.metadata.PackageNotFoundError:
+        return "0.0.0"  # Fallback for development mode
+
+def __getattr__(name: str):
+    # Resolve the package version on first access instead of at import
+    if name == "__version__":
+        return _get_version()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 __all__ = [
             "AnalysisService",
@@ -151,6 +151,32 @@ class AnalysisService:
             logger.error(f"Error deleting analysis {analysis_id}: {str(e)}")
             raise
 
+    async def queue_analysis(
+        self,
+        analysis_id: str,
+        opportunity_id: str,
+        owner_id: str
+    ) -> Optional[Analysis]:
+        """Mark an analysis as waiting for a workflow worker"""
+        
+        logger.debug(f"Queueing analysis {analysis_id} for opportunity {opportunity_id} by owner {owner_id}")
+        
+        try:
+            updated_analysis = await self.analysis_repo.update_analysis(
+                analysis_id=analysis_id,
+                updates={"status": "pending"},
+                opportunity_id=opportunity_id,
+                owner_id=owner_id
+            )
+            
+            if updated_analysis:
+                logger.debug(f"Queued analysis {analysis_id}")
+            
+            return updated_analysis
+        except Exception as e:
+            logger.error(f"Error queueing analysis {analysis_id}: {str(e)}")
+            raise
+    
     async def start_analysis(
         self,
         analysis_id: str,
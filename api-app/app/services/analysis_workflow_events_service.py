@@ -1,4 +1,4 @@
-from typing import List, Optional, Dict, Any
+from typing import AsyncIterator, List, Optional, Dict, Any
 from datetime import datetime, timezone
 import logging
 
@@ -39,6 +39,20 @@ class AnalysisWorkflowEventsService:
             logger.error(f"Error retrieving events for analysis {analysis_id}: {str(e)}")
             raise
     
+    async def iter_events_by_analysis(
+        self,
+        analysis_id: str,
+        opportunity_id: str,
+        owner_id: Optional[str] = None
+    ) -> AsyncIterator[AnalysisWorkflowEvent]:
+        """Stream the events for a specific analysis from the database without loading them all at once"""
+        async for event in self.workflow_event_repo.iter_events_by_analysis(
+            analysis_id=analysis_id,
+            opportunity_id=opportunity_id,
+            owner_id=owner_id
+        ):
+            yield event
+    
     def cache_event(
         self,
         analysis_id: str,
@@ -17,7 +17,7 @@ from agent_framework import (ExecutorInvokedEvent,
                              WorkflowStatusEvent)
 
 from app.utils.sse_stream_event_queue import SSEStreamEventQueue
-from app.dependencies import get_chat_client
+from app.utils.chat_client import get_chat_client
 from app.workflow import AnalysisRunInput, InvestmentAnalysisWorkflow
 from app.services import AnalysisService, OpportunityService
 from app.models import StreamEventMessage
@@ -145,8 +145,8 @@ class AnalysisWorkflowExecutorService:
         try:
             logger.info(f"Starting workflow execution for analysis {analysis_id}")
             
-            # get the opportunity details
-            analysis = await self.analysis_service.get_analysis_by_id(analysis_id=analysis_id, opportunity_id=opportunity_id)
+            # Mark the analysis as started now that a worker runs it
+            analysis = await self.analysis_service.start_analysis(analysis_id=analysis_id, opportunity_id=opportunity_id, owner_id=owner_id)
             if not analysis:
                 raise Exception(f"Analysis {analysis_id} not found for opportunity {opportunity_id}")
             
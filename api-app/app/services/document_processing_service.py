@@ -80,10 +80,11 @@ class DocumentProcessingService:
             Dict with processing job details
         """
         try:
-            # Validate documents exist and belong to opportunity
+            # Validate documents exist and belong to opportunity, all of them are read with one query
+            found = await self.document_repo.get_documents_by_ids(document_ids, opportunity_id)
             documents = []
             for doc_id in document_ids:
-                doc = await self.document_repo.get_opportunity_by_id(doc_id, opportunity_id)
+                doc = found.get(doc_id)
                 if not doc:
                     logger.warning(f"Document {doc_id} not found or doesn't belong to opportunity {opportunity_id}")
                     continue
@@ -131,10 +132,11 @@ class DocumentProcessingService:
             SSE formatted event strings
         """
         try:
-            # Validate documents
+            # Validate documents, all of them are read with one query
+            found = await self.document_repo.get_documents_by_ids(document_ids, opportunity_id)
             documents = []
             for doc_id in document_ids:
-                doc = await self.document_repo.get_opportunity_by_id(doc_id, opportunity_id)
+                doc = found.get(doc_id)
                 if not doc:
                     yield self._format_sse_event({
                         "type": "error",
@@ -340,7 +342,7 @@ class DocumentProcessingService:
     ) -> Optional[Dict[str, Any]]:
         """Get current processing status of a document"""
         try:
-            document = await self.document_repo.get_opportunity_by_id(document_id, opportunity_id)
+            document = await self.document_repo.get_document_by_id(document_id, opportunity_id)
             if not document:
                 return None
             
@@ -1,5 +1,6 @@
-from typing import List, Optional, Dict, Any
+from typing import BinaryIO, List, Optional, Dict, Any
 from datetime import datetime, timezone
+import io
 import logging
 import mimetypes
 import os
@@ -75,6 +76,43 @@ class DocumentService:
             uploaded_by: User ID of the uploader
             tags: Optional tags for categorization
             
+        Returns:
+            Document: Created document record
+        """
+        return await self.upload_document_stream(
+            file_obj=io.BytesIO(file_content),
+            size=len(file_content),
+            filename=filename,
+            opportunity_id=opportunity_id,
+            opportunity_name=opportunity_name,
+            content_type=content_type,
+            uploaded_by=uploaded_by,
+            tags=tags
+        )
+    
+    async def upload_document_stream(
+        self,
+        file_obj: BinaryIO,
+        size: int,
+        filename: str,
+        opportunity_id: str,
+        opportunity_name: str,
+        content_type: Optional[str] = None,
+        uploaded_by: Optional[str] = None,
+        tags: Optional[List[str]] = None
+    ) -> Document:
+        """
+        Stream a document from a file object to blob storage and create a database record
+        
+        Args:
+            file_obj: Readable file object positioned at the start of the content
+            size: Size of the content in bytes
+            filename: Original filename
+            opportunity_id: ID of the associated opportunity
+            content_type: MIME type of the file
+            uploaded_by: User ID of the uploader
+            tags: Optional tags for categorization
+            
         Returns:
             Document: Created document record
         """
@@ -99,9 +137,10 @@ class DocumentService:
             
             # Upload to blob storage
             blob_url = await self.blob_storage.upload_file(
-                file_content=file_content,
+                file_content=file_obj,
                 blob_name=file_path,
-                content_type=content_type
+                content_type=content_type,
+                length=size
             )
             
             # Create document record in database
@@ -112,7 +151,7 @@ class DocumentService:
                 file_url=blob_url,
                 file_type=file_extension,
                 mime_type=content_type,
-                size=len(file_content),
+                size=size,
                 uploaded_by=uploaded_by,
                 tags=tags or [],
                 processing_status="completed", # TODO: Default to completed for demo purposes, update once document processing is implemented
@@ -238,7 +277,7 @@ class DocumentService:
             str: Download URL or None if document not found
         """
         try:
-            document = await self.document_repo.get_opportunity_by_id(document_id, opportunity_id)
+            document = await self.document_repo.get_document_by_id(document_id, opportunity_id)
             if not document:
                 logger.warning(f"Document {document_id} not found")
                 return None
@@ -368,13 +407,15 @@ class DocumentService:
             Dictionary with processing statistics
         """
         try:
-            documents = await self.get_documents_by_opportunity(opportunity_id)
-            
-            total_documents = len(documents)
-            pending_count = sum(1 for doc in documents if doc.processing_status == "pending")
-            processing_count = sum(1 for doc in documents if doc.processing_status == "processing")
-            completed_count = sum(1 for doc in documents if doc.processing_status == "completed")
-            error_count = sum(1 for doc in documents if doc.processing_status == "error")
+            status_counts: Dict[str, int] = {}
+            async for doc in self.document_repo.iter_by_opportunity(opportunity_id):
+                status_counts[doc.processing_status] = status_counts.get(doc.processing_status, 0) + 1
+            
+            total_documents = sum(status_counts.values())
+            pending_count = status_counts.get("pending", 0)
+            processing_count = status_counts.get("processing", 0)
+            completed_count = status_counts.get("completed", 0)
+            error_count = status_counts.get("error", 0)
             
             return {
                 "opportunity_id": opportunity_id,
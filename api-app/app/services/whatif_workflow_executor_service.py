@@ -17,11 +17,11 @@ from agent_framework import (ExecutorInvokedEvent,
                              ChatMessage)
 
 from app.utils.sse_stream_event_queue import SSEStreamEventQueue
-from app.dependencies import get_chat_client
+from app.utils.chat_client import get_chat_client
 from app.database.repositories import WhatIfMessageRepository
 from app.services import AnalysisService
 from app.what_if_chat import WhatIfChatWorkflow, ConversationContext, WhatIfChatWorkflowInputData
-from app.models import StreamEventMessage, WhatIfMessage, WhatIfConversation
+from app.models import StreamEventMessage, WhatIfMessage, WhatIfConversation, WhatIfConversationSummary
 
 logger = logging.getLogger("app.workflow.what_if_workflow_executor")
 
@@ -282,7 +282,7 @@ class WhatIfWorkflowExecutorService:
         analysis_id: str,
         page: int = 1,
         page_size: int = 10
-    ) -> List[WhatIfConversation]:
+    ) -> List[WhatIfConversationSummary]:
         """List all conversation IDs with pagination"""
         conversations = await self.what_if_message_repository.list_conversations(analysis_id=analysis_id, page=page, limit=page_size)
         return conversations
@@ -1,6 +1,7 @@
+import asyncio
 import logging
 import os
-from typing import Optional, BinaryIO
+from typing import Optional, BinaryIO, Union
 from datetime import datetime, timedelta, timezone
 from azure.storage.blob import BlobServiceClient, BlobClient, ContentSettings, generate_blob_sas, BlobSasPermissions
 from azure.core.exceptions import ResourceNotFoundError, AzureError
@@ -10,6 +11,9 @@ from app.utils.credential import get_azure_credential
 
 logger = logging.getLogger("app.utils.blob_storage")
 
+# Number of blocks of one blob uploaded in parallel
+UPLOAD_MAX_CONCURRENCY = 4
+
 
 class BlobStorageService:
     """Service for interacting with Azure Blob Storage"""
@@ -56,12 +60,13 @@ class BlobStorageService:
         
     async def upload_file(
         self,
-        file_content: bytes,
+        file_content: Union[bytes, BinaryIO],
         blob_name: str,
-        content_type: Optional[str] = None
+        content_type: Optional[str] = None,
+        length: Optional[int] = None
     ) -> tuple[str, str]:
         """
-        Upload a file to blob storage
+        Upload a file to blob storage, file objects are read and sent in chunks
         
         Returns:
             tuple: (blob_url, blob_name)
@@ -78,11 +83,14 @@ class BlobStorageService:
             if content_type:
                 content_settings = ContentSettings(content_type=content_type)
             
-            # Upload the file
-            blob_client.upload_blob(
+            # Upload the file, the sync client runs in a worker thread so concurrent uploads overlap
+            await asyncio.to_thread(
+                blob_client.upload_blob,
                 file_content,
+                length=length,
                 content_settings=content_settings,
-                overwrite=False
+                overwrite=False,
+                max_concurrency=UPLOAD_MAX_CONCURRENCY
             )
             
             blob_url = blob_client.url
@@ -190,14 +198,21 @@ class BlobStorageService:
 # Global blob storage service instance
 _blob_storage_service: Optional[BlobStorageService] = None
 
+# Guards service creation against concurrent callers
+_blob_storage_lock = asyncio.Lock()
+
 
 async def get_blob_storage_service() -> BlobStorageService:
     """Get or create the blob storage service singleton"""
     global _blob_storage_service
     
     if _blob_storage_service is None:
-        _blob_storage_service = BlobStorageService()
-        await _blob_storage_service.connect()
+        async with _blob_storage_lock:
+            # Only publish the service once it is connected
+            if _blob_storage_service is None:
+                service = BlobStorageService()
+                await service.connect()
+                _blob_storage_service = service
     
     return _blob_storage_service
 
@@ -0,0 +1,47 @@
+import logging
+from typing import Optional
+
+from agent_framework import BaseChatClient
+from azure.identity import ChainedTokenCredential
+
+from app.core.config import settings
+from app.utils.credential import create_azure_credential
+
+logger = logging.getLogger("app.utils.chat_client")
+
+
+# Global chat client instance
+_chat_client: Optional[BaseChatClient] = None
+
+# Credential owned by the chat client, not shared with other clients so it can be closed with it
+_chat_credential: Optional[ChainedTokenCredential] = None
+
+
+async def get_chat_client() -> BaseChatClient:
+    """Get or create the AzureOpenAIChatClient singleton"""
+    from agent_framework.azure import AzureOpenAIChatClient
+    global _chat_client, _chat_credential
+
+    if _chat_client is None:
+        _chat_credential = create_azure_credential()
+        _chat_client = AzureOpenAIChatClient(endpoint=settings.AZURE_OPENAI_ENDPOINT,
+                                             deployment_name=settings.AZURE_OPENAI_DEPLOYMENT_NAME,
+                                             credential=_chat_credential)
+        logger.info("Created Azure OpenAI chat client")
+
+    return _chat_client
+
+
+async def close_chat_client():
+    """Close the chat client singleton and its credential"""
+    global _chat_client, _chat_credential
+
+    if _chat_client is not None:
+        # The chat client wraps an async OpenAI client that owns the HTTP connection pool
+        await _chat_client.client.close()
+        _chat_client = None
+        logger.info("Closed Azure OpenAI chat client")
+
+    if _chat_credential is not None:
+        _chat_credential.close()
+        _chat_credential = None
@@ -9,23 +9,23 @@ _async_credential : ChainedTokenCredentialAsync = None
 _synch_credential : ChainedTokenCredential = None
 
 async def get_azure_credential_async():
-    credential_chain = (
-        # Try EnvironmentCredential first
-        EnvironmentCredentialAsync(),
-        # Then try ManagedIdentityCredential
-        ManagedIdentityCredentialAsync(client_id=os.environ.get("AZURE_CLIENT_ID")),
-        # Fallback to Azure CLI if EnvironmentCredential fails
-        AzureCliCredentialAsync(),
-    )
-
     global _async_credential
     if not _async_credential:
+        credential_chain = (
+            # Try EnvironmentCredential first
+            EnvironmentCredentialAsync(),
+            # Then try ManagedIdentityCredential
+            ManagedIdentityCredentialAsync(client_id=os.environ.get("AZURE_CLIENT_ID")),
+            # Fallback to Azure CLI if EnvironmentCredential fails
+            AzureCliCredentialAsync(),
+        )
         _async_credential = ChainedTokenCredentialAsync(*credential_chain)
         
     return _async_credential
 
 
-def get_azure_credential():
+def create_azure_credential() -> ChainedTokenCredential:
+    """Create a new credential chain, for clients that own and close their credential"""
     credential_chain = (
         # Try EnvironmentCredential first
         EnvironmentCredential(),
@@ -34,9 +34,12 @@ def get_azure_credential():
         # Fallback to Azure CLI if EnvironmentCredential fails
         AzureCliCredential(),
     )
-    
+    return ChainedTokenCredential(*credential_chain)
+
+
+def get_azure_credential():
     global _synch_credential
     if not _synch_credential:
-        _synch_credential = ChainedTokenCredential(*credential_chain)
+        _synch_credential = create_azure_credential()
 
     return _synch_credential
\ No newline at end of file
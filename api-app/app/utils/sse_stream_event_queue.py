@@ -2,9 +2,10 @@
 Event Queue Manager for Analysis Workflow Events
 Implements a queue-based approach for SSE event streaming with persistence
 """
-from typing import Dict, List, Optional, Any
+from typing import AsyncGenerator, AsyncIterator, Dict, List, Optional, Any, Union
 from datetime import datetime, timezone
 from collections import defaultdict, deque
+from itertools import islice
 import asyncio
 import json
 import logging
@@ -14,26 +15,43 @@ from app.models import StreamEventMessage
 
 logger = logging.getLogger("app.utils.event_queue")
 
+# Comment frame pushed to listeners so idle SSE connections are not dropped by proxies
+SSE_KEEP_ALIVE_FRAME = b": keep-alive\n\n"
+
+# Response headers shared by every SSE stream, Starlette only reads them
+SSE_RESPONSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    "X-Accel-Buffering": "no",  # Disable buffering in nginx
+    "Content-Encoding": "identity",  # Keep the gzip middleware from buffering live events
+    "Access-Control-Allow-Origin": "*",  # Allow CORS for SSE
+    "Access-Control-Allow-Credentials": "true"
+}
+
 
 class SSEStreamEventQueue:
     """Manages sse stream event queues for workflows with persistence"""
     
     def __init__(self, max_events: int = 1000):
-        # Store events per analysis_id
+        # Store events per analysis_id, a ring buffer shared by every listener
         self._queue: deque = deque(maxlen=max_events)
         # Track event sequence numbers
         self._sequence_number: int = 0
-        # Track active listeners (for live streaming)
-        self._listeners: List[asyncio.Queue] = []
-        # Lock for thread safety
-        self._lock = asyncio.Lock()
+        # Bumped by each heartbeat so idle listeners wake up to send a keep-alive
+        self._keep_alive_count: int = 0
+        # Guards the buffer and wakes listeners when events are added
+        self._condition = asyncio.Condition()
+        # Opportunity, analysis and owner the stream was verified for when the workflow was started
+        self.opportunity_id: Optional[str] = None
+        self.analysis_id: Optional[str] = None
+        self.owner_id: Optional[str] = None
         
     async def add_event(
         self,
         event_msg: StreamEventMessage
     ) -> None:
         """Add an event to the queue for a specific analysis"""
-        async with self._lock:
+        async with self._condition:
             if not isinstance(event_msg, StreamEventMessage):
                 raise ValueError("event must be an instance of StreamEventMessage")
 
@@ -45,15 +63,14 @@ class SSEStreamEventQueue:
             event_msg.sequence = seq
             self._sequence_number += 1
             
+            # Encode the SSE frame once here, every listener and replay reuses the cached bytes
+            event_msg.to_sse_format()
+            
             # Store event
             self._queue.append(event_msg)
             
             # Notify active listeners
-            for listener_queue in self._listeners:
-                try:
-                    await listener_queue.put(event_msg)
-                except Exception as e:
-                    logger.error(f"Error notifying listener: {str(e)}")
+            self._condition.notify_all()
 
             logger.debug(f"Added event: {event_msg.type} - {event_msg.executor}")
             
@@ -62,43 +79,108 @@ class SSEStreamEventQueue:
         since_sequence: Optional[int] = None
     ) -> List[StreamEventMessage]:
         """Get all events for an sse stream, optionally since a sequence number"""
-        async with self._lock:
-            events = list(self._queue)
-            
-            if since_sequence is not None:
-                events = [
-                    e for e in events 
-                    if e.sequence > since_sequence
-                ]
-            
-            return events
+        async with self._condition:
+            return self._events_since(since_sequence)
     
-    async def register_listener(self) -> asyncio.Queue:
-        """Register a new listener for real-time events"""
-        async with self._lock:
-            listener_queue = asyncio.Queue()
-            self._listeners.append(listener_queue)
-            logger.debug(f"Registered listener")
-            return listener_queue
+    def _events_since(self, since_sequence: Optional[int]) -> List[StreamEventMessage]:
+        """Slice the stored events after a sequence number, the caller holds the condition"""
+        if since_sequence is None:
+            return list(self._queue)
+        
+        # Sequence number of the oldest event still in the ring buffer
+        first_sequence = self._sequence_number - len(self._queue)
+        return list(islice(self._queue, max(since_sequence + 1 - first_sequence, 0), None))
     
-    async def unregister_listener(self, listener_queue: asyncio.Queue):
-        """Remove a listener"""
-        async with self._lock:
-            try:
-                self._listeners.remove(listener_queue)
-                logger.debug(f"Unregistered listener")
-            except ValueError:
-                pass
+    def _has_events_since(self, since_sequence: Optional[int]) -> bool:
+        """Check whether a stored event is newer than a sequence number, the caller holds the condition"""
+        return bool(self._queue) and (since_sequence is None or self._queue[-1].sequence > since_sequence)
+    
+    async def listen(self, since_sequence: Optional[int] = None) -> AsyncIterator[bytes]:
+        """Yield the SSE frames of the stored events since a sequence number, then of new events as they are added"""
+        last_sequence = since_sequence
+        keep_alive_count = self._keep_alive_count
+        while True:
+            async with self._condition:
+                # Each listener only keeps a cursor into the shared buffer
+                await self._condition.wait_for(
+                    lambda: self._has_events_since(last_sequence) or self._keep_alive_count != keep_alive_count
+                )
+                events = self._events_since(last_sequence)
+                send_keep_alive = not events and self._keep_alive_count != keep_alive_count
+                keep_alive_count = self._keep_alive_count
+                if events:
+                    last_sequence = events[-1].sequence
+            
+            # Send everything added since the last wake-up, including a replayed backlog, as one body chunk
+            if events:
+                yield b"".join(event_msg.to_sse_format() for event_msg in events)
+            if send_keep_alive:
+                yield SSE_KEEP_ALIVE_FRAME
+    
+    async def send_keep_alive(self) -> None:
+        """Wake every active listener to send a keep-alive frame"""
+        async with self._condition:
+            self._keep_alive_count += 1
+            self._condition.notify_all()
     
     async def clear_event_queue(self):
         """Clear all events for an analysis"""
-        async with self._lock:
+        async with self._condition:
             if self._queue:
                 self._queue.clear()
                 self._sequence_number = 0
-            self._listeners.clear()
-            logger.debug(f"Cleared events and listeners")
+            logger.debug(f"Cleared events")
     
     def get_event_queue_count(self) -> int:
         """Get the number of events in the queue"""
-        return len(self._queue)
\ No newline at end of file
+        return len(self._queue)
+
+
+async def batch_sse_frames(
+    frames: AsyncIterator[Union[str, bytes]],
+    max_bytes: int = 4096,
+    max_wait: float = 0.05
+) -> AsyncGenerator[bytes, None]:
+    """
+    Coalesce SSE frames that arrive close together into larger body chunks
+    
+    The first frame is sent right away. Later frames are buffered until max_bytes is reached
+    or no further frame arrives within max_wait seconds.
+    """
+    iterator = frames.__aiter__()
+    buffer = bytearray()
+    pending: Optional[asyncio.Future] = None
+    first_frame = True
+    try:
+        while True:
+            # The pending read is kept across timeouts, cancelling it would end the source generator
+            if pending is None:
+                pending = asyncio.ensure_future(iterator.__anext__())
+            if buffer:
+                done, _ = await asyncio.wait({pending}, timeout=max_wait)
+                if not done:
+                    yield bytes(buffer)
+                    buffer.clear()
+                    continue
+            else:
+                await asyncio.wait({pending})
+            
+            try:
+                frame = pending.result()
+            except StopAsyncIteration:
+                break
+            finally:
+                pending = None
+            
+            buffer += frame.encode() if isinstance(frame, str) else frame
+            if first_frame or len(buffer) >= max_bytes:
+                first_frame = False
+                yield bytes(buffer)
+                buffer.clear()
+        
+        if buffer:
+            yield bytes(buffer)
+    finally:
+        if pending is not None:
+            pending.cancel()
+            await asyncio.gather(pending, return_exceptions=True)
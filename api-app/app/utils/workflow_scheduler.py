@@ -0,0 +1,72 @@
+import asyncio
+import contextvars
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("app.utils.workflow_scheduler")
+
+
+class WorkflowScheduler:
+    """Runs submitted workflow executions on a fixed pool of worker tasks, independent of the requests that submitted them"""
+
+    def __init__(self, name: str, workers: int = 4,
+                 on_abandoned: Optional[Callable[..., Awaitable[Any]]] = None):
+        self.name = name
+        self.workers = workers
+        # Called with the kwargs of every execution still running or queued when the scheduler stops
+        self.on_abandoned = on_abandoned
+        self._queue: asyncio.Queue[Tuple[Callable[..., Awaitable[Any]], Dict[str, Any]]] = asyncio.Queue()
+        self._worker_tasks: List[asyncio.Task] = []
+        self._running: Dict[int, Dict[str, Any]] = {}
+
+    def start(self):
+        """Start the worker tasks"""
+        if self._worker_tasks:
+            return
+
+        # Workers run in an empty context so they never inherit the state of the request that started them
+        self._worker_tasks = [
+            asyncio.create_task(self._worker(worker_id), name=f"{self.name}-worker-{worker_id}",
+                                context=contextvars.Context())
+            for worker_id in range(self.workers)
+        ]
+        logger.info("Started %s scheduler with %s workers", self.name, self.workers)
+
+    async def submit(self, workflow_function: Callable[..., Awaitable[Any]], **kwargs):
+        """Queue a workflow execution for the next free worker"""
+        await self._queue.put((workflow_function, kwargs))
+        logger.debug("Queued %s execution, %s waiting", self.name, self._queue.qsize())
+
+    async def _worker(self, worker_id: int):
+        """Run queued workflow executions one at a time"""
+        while True:
+            workflow_function, kwargs = await self._queue.get()
+            self._running[worker_id] = kwargs
+            try:
+                await workflow_function(**kwargs)
+            except Exception:
+                logger.exception("%s execution failed on worker %s", self.name, worker_id)
+            finally:
+                self._running.pop(worker_id, None)
+                self._queue.task_done()
+
+    async def stop(self):
+        """Cancel the worker tasks and report the executions still running or queued as abandoned"""
+        abandoned = list(self._running.values())
+        while not self._queue.empty():
+            _, kwargs = self._queue.get_nowait()
+            abandoned.append(kwargs)
+
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+        self._running.clear()
+
+        if self.on_abandoned:
+            for kwargs in abandoned:
+                try:
+                    await self.on_abandoned(**kwargs)
+                except Exception:
+                    logger.exception("Failed to report abandoned %s execution", self.name)
+        logger.info("Stopped %s scheduler, %s executions abandoned", self.name, len(abandoned))
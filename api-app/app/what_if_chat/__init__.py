@@ -1,12 +1,21 @@
+import functools
 import importlib.metadata
 
 from .what_if_workflow import WhatIfChatWorkflow 
 from .what_if_models import WhatIfChatWorkflowInputData, ConversationContext
 
-try:
-    __version__ = importlib.metadata.version(__name__)
-except importlib.metadata.PackageNotFoundError:
-    __version__ = "0.0.0"  # Fallback for development mode
+@functools.cache
+def _get_version() -> str:
+    try:
+        return importlib.metadata.version(__name__)
+    except importlib.metadata.PackageNotFoundError:
+        return "0.0.0"  # Fallback for development mode
+
+def __getattr__(name: str):
+    # Resolve the package version on first access instead of at import
+    if name == "__version__":
+        return _get_version()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 __all__ = [
             "WhatIfChatWorkflow",
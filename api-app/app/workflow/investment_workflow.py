@@ -2,7 +2,7 @@ import logging
 
 from agent_framework import BaseChatClient, Workflow, WorkflowBuilder
 
-from app.dependencies import get_chat_client
+from app.utils.chat_client import get_chat_client
 from .investment_models import AnalysisRunInput
 from .investment_executors import (
     DataPreparationExecutor,
@@ -2,11 +2,13 @@ import datetime
 import time
 from fastapi import FastAPI, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse
 from contextlib import asynccontextmanager
 import uvicorn
 
 from app.core.config import settings
+from app.database.cache import RequestItemCacheMiddleware
 from app.utils.logging import setup_logger
 from app.dependencies import initialize_all, close_all, get_cosmos_client
 from app.routers import opportunity, analysis, chat
@@ -25,7 +27,9 @@ def initialize_api_application() -> FastAPI:
         title=settings.PROJECT_NAME,
         version=settings.VERSION,
         debug=settings.DEBUG,
-        lifespan=lifespan
+        lifespan=lifespan,
+        # Render every endpoint's JSON with orjson unless it returns its own response
+        default_response_class=ORJSONResponse
     )
 
     # CORS middleware
@@ -37,6 +41,13 @@ def initialize_api_application() -> FastAPI:
         allow_headers=settings.ALLOW_HEADERS,
     )
 
+    # Compress larger JSON payloads such as analysis lists and event histories,
+    # SSE responses opt out with an identity Content-Encoding
+    app.add_middleware(GZipMiddleware, minimum_size=1024)
+
+    # Give each request its own read cache for Cosmos DB point reads
+    app.add_middleware(RequestItemCacheMiddleware)
+
     # Include routers
     app.include_router(opportunity.router, prefix="/api")
     app.include_router(analysis.router, prefix="/api")